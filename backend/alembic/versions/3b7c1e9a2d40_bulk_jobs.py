@@ -0,0 +1,65 @@
+"""bulk jobs
+
+Revision ID: 3b7c1e9a2d40
+Revises: f0dfdd5c4d1f
+Create Date: 2026-10-18 09:12:03.114207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7c1e9a2d40'
+down_revision: Union[str, Sequence[str], None] = 'f0dfdd5c4d1f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('bulk_jobs',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=True),
+    sa.Column('filename', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('total_rows', sa.Integer(), nullable=False),
+    sa.Column('rows_done', sa.Integer(), nullable=False),
+    sa.Column('rows_failed', sa.Integer(), nullable=False),
+    sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bulk_jobs_owner_id'), 'bulk_jobs', ['owner_id'], unique=False)
+    op.create_table('bulk_job_rows',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Uuid(), nullable=False),
+    sa.Column('row_index', sa.Integer(), nullable=False),
+    sa.Column('apn', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('street_address', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('county', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('state', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('done', sa.Boolean(), nullable=False),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['bulk_jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job_id', 'row_index', name='uq_bulk_job_rows_job_row')
+    )
+    # worker scans for unfinished rows of a job in row order
+    op.create_index('ix_bulk_job_rows_pending', 'bulk_job_rows', ['job_id', 'row_index'],
+                    unique=False, postgresql_where=sa.text('NOT done'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bulk_job_rows_pending', table_name='bulk_job_rows')
+    op.drop_table('bulk_job_rows')
+    op.drop_index(op.f('ix_bulk_jobs_owner_id'), table_name='bulk_jobs')
+    op.drop_table('bulk_jobs')
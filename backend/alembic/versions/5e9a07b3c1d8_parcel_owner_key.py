@@ -0,0 +1,56 @@
+"""parcel owner key
+
+Revision ID: 5e9a07b3c1d8
+Revises: 8d21f4c0a6b3
+Create Date: 2026-10-18 14:37:12.204861
+
+The unique (owner_id, apn, county, state) key can only be added once
+duplicate owned parcels are gone. All but the newest row of each
+duplicate group are removed from `parcel`. Those rows are lost to the
+app, but they are moved, not dropped: they are copied into
+`parcel_owner_key_duplicates`, and the count is logged. Downgrading
+leaves that table in place; drop it once nothing needs restoring.
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+log = logging.getLogger("alembic.runtime.migration")
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9a07b3c1d8'
+down_revision: Union[str, Sequence[str], None] = '8d21f4c0a6b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # keep the newest row of any existing (owner, apn, county, state) duplicates;
+    # the older ones move to a side table instead of disappearing
+    op.execute(sa.text(
+        "CREATE TABLE IF NOT EXISTS parcel_owner_key_duplicates (LIKE parcel)"
+    ))
+    moved = op.get_bind().execute(sa.text(
+        "WITH removed AS ("
+        " DELETE FROM parcel p USING parcel q"
+        " WHERE p.owner_id = q.owner_id AND p.apn = q.apn"
+        " AND p.county = q.county AND p.state = q.state AND p.id < q.id"
+        " RETURNING p.*"
+        ") INSERT INTO parcel_owner_key_duplicates SELECT * FROM removed"
+    )).rowcount
+    if moved:
+        log.warning(
+            "uq_parcel_owner_key: moved %d duplicate owned parcel(s) to parcel_owner_key_duplicates",
+            moved,
+        )
+    op.create_unique_constraint('uq_parcel_owner_key', 'parcel',
+                                ['owner_id', 'apn', 'county', 'state'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_parcel_owner_key', 'parcel', type_='unique')
@@ -0,0 +1,30 @@
+"""parcel cache key
+
+Revision ID: 8d21f4c0a6b3
+Revises: 3b7c1e9a2d40
+Create Date: 2026-10-18 10:02:41.530118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d21f4c0a6b3'
+down_revision: Union[str, Sequence[str], None] = '3b7c1e9a2d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # shared lookup-cache rows (owner_id NULL): one per (apn, county, state)
+    op.create_index('ix_parcel_cache_key', 'parcel', ['apn', 'county', 'state'],
+                    unique=True, postgresql_where=sa.text('owner_id IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parcel_cache_key', table_name='parcel')
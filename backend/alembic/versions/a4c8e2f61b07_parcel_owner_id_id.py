@@ -0,0 +1,29 @@
+"""parcel owner_id, id index
+
+Revision ID: a4c8e2f61b07
+Revises: 5e9a07b3c1d8
+Create Date: 2026-10-18 16:05:48.772310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f61b07'
+down_revision: Union[str, Sequence[str], None] = '5e9a07b3c1d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # keyset pagination: WHERE owner_id = ? AND id > ? ORDER BY id LIMIT n
+    op.create_index('ix_parcel_owner_id_id', 'parcel', ['owner_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parcel_owner_id_id', table_name='parcel')
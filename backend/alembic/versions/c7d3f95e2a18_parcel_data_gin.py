@@ -0,0 +1,32 @@
+"""parcel data gin index
+
+Revision ID: c7d3f95e2a18
+Revises: a4c8e2f61b07
+Create Date: 2026-10-18 17:21:09.338415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d3f95e2a18'
+down_revision: Union[str, Sequence[str], None] = 'a4c8e2f61b07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # jsonb_path_ops: smaller than the default opclass and covers @> containment,
+    # which is all the utility filters use; shared cache rows are left out
+    op.create_index('ix_parcel_data', 'parcel', ['data'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'data': 'jsonb_path_ops'},
+                    postgresql_where=sa.text('owner_id IS NOT NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parcel_data', table_name='parcel')
@@ -0,0 +1,37 @@
+"""parcel centroid
+
+Revision ID: e1b6a3d90c4f
+Revises: c7d3f95e2a18
+Create Date: 2026-10-18 18:44:27.915063
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b6a3d90c4f'
+down_revision: Union[str, Sequence[str], None] = 'c7d3f95e2a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS postgis')
+    op.add_column('parcel', sa.Column(
+        'centroid',
+        geoalchemy2.types.Geometry(geometry_type='POINT', srid=4326, spatial_index=False),
+        nullable=True,
+    ))
+    op.create_index('ix_parcel_centroid', 'parcel', ['centroid'], unique=False,
+                    postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parcel_centroid', table_name='parcel')
+    op.drop_column('parcel', 'centroid')
@@ -5,6 +5,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core import principal_cache
 from ..core.config import settings
 from ..core.database import get_session
 from ..crud.crud_user import crud_user
@@ -36,8 +37,15 @@ async def get_current_user(
         user_id = int(payload.get("sub"))
     except (JWTError, ValueError, TypeError):
         raise credentials_exc
+    token_exp = payload.get("exp")
+
+    # the token is verified above either way; the cache only saves the SELECT
+    user = await principal_cache.get(user_id, token, token_exp)
+    if user is not None:
+        return user
 
     user = await crud_user.get(db, user_id)
     if not user or not user.is_active:
         raise credentials_exc
+    await principal_cache.put(user, token, token_exp)
     return user
@@ -7,12 +7,20 @@ from ...deps import get_session, get_current_user
 from ....schemas.token import Token
 from ....schemas.user import UserCreate, UserRead
 from ....crud.crud_user import crud_user
-from ....core.security import create_access_token
+from ....core.security import PasswordHashBusy, create_access_token
 from ....models.user import User
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _hash_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": "2"},
+    )
+
+
 # ───────────────────────────────────────────────────────────────
 #  Register
 # ───────────────────────────────────────────────────────────────
@@ -24,7 +32,10 @@ async def register_user(
     existing = await crud_user.get_by_email(db, payload.email)
     if existing:
         raise HTTPException(status_code=400, detail="User already exists")
-    user = await crud_user.create(db, obj_in=payload)
+    try:
+        user = await crud_user.create(db, obj_in=payload)
+    except PasswordHashBusy as exc:
+        raise _hash_busy() from exc
     return user
 
 
@@ -36,7 +47,10 @@ async def login_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_session),
 ):
-    user = await crud_user.authenticate(db, email=form_data.username, password=form_data.password)
+    try:
+        user = await crud_user.authenticate(db, email=form_data.username, password=form_data.password)
+    except PasswordHashBusy as exc:
+        raise _hash_busy() from exc
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     access_token = create_access_token(str(user.id))
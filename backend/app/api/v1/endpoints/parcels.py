@@ -1,20 +1,173 @@
-from typing import List
+import uuid
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ...deps import get_current_user, get_session
 from ....models.user import User
-from ....services.parcel_lookup import get_utilities_for_parcel
-from ....services.csv_processor import parse_in_memory
+from ....services.parcel_cache import lookup_with_cache
+from ....services.host_guard import UpstreamUnavailable
+from ....services.bulk import to_utility_list
+from ....services.bulk_jobs import RUN_BULK_JOB_TASK, job_status
+from ....core.celery_app import enqueue
+from ....core.pagination import decode_cursor, encode_cursor
+from ....crud.crud_bulk_job import crud_bulk_job
+from ....crud.crud_parcel import crud_parcel
 from ....schemas.parcel import (
+    ParcelLocated,
+    ParcelLocatedPage,
     ParcelLookupRequest,
+    ParcelPage,
+    ParcelRead,
+    ParcelRowError,
+    ParcelUtilityFilter,
     ParcelUtilityInfo,
     ParcelUtilityList,
 )
+from ....schemas.bulk_job import BulkJobRead, BulkJobResultsPage
 
 router = APIRouter(prefix="/parcels", tags=["parcels"])
 
+# The file endpoints import services.csv_processor / enriched_export (pandas,
+# openpyxl, pyarrow) inside the handler: they load on first use or from the
+# startup warm-up in main.py, not while the worker boots.
+
+UPLOAD_CONTENT_TYPES = {
+    "text/csv",
+    "application/vnd.ms-excel",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+# ------------------------------------------------------------------
+#  0️⃣  Saved parcels (keyset-paginated)
+# ------------------------------------------------------------------
+@router.get(
+    "",
+    response_model=ParcelPage,
+    summary="List the current user's saved parcels",
+)
+async def list_parcels(
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Parcels in id order. Follow `next_cursor` until it is null; every page
+    costs the same regardless of depth.
+    """
+    try:
+        after_id = decode_cursor(cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    # one extra row tells us whether another page exists
+    rows = await crud_parcel.get_multi_by_owner(
+        db, owner_id=current_user.id, after_id=after_id, limit=limit + 1
+    )
+    items = [ParcelRead.model_validate(r) for r in rows[:limit]]
+    next_cursor = encode_cursor(items[-1].id) if len(rows) > limit else None
+    return ParcelPage(items=items, next_cursor=next_cursor)
+
+
+@router.get(
+    "/query",
+    response_model=ParcelPage,
+    summary="Filter the current user's saved parcels by utility results",
+)
+async def query_parcels(
+    filters: ParcelUtilityFilter = Depends(),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    e.g. `?septic_present=true&sewer_available=false` – parcels on septic
+    with no sewer provider. Filters run server-side against the stored
+    results; paging works like `GET /parcels`.
+    """
+    try:
+        after_id = decode_cursor(cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    rows = await crud_parcel.query_by_utilities(
+        db,
+        owner_id=current_user.id,
+        match=filters.model_dump(exclude_none=True),
+        after_id=after_id,
+        limit=limit + 1,
+    )
+    items = [ParcelRead.model_validate(r) for r in rows[:limit]]
+    next_cursor = encode_cursor(items[-1].id) if len(rows) > limit else None
+    return ParcelPage(items=items, next_cursor=next_cursor)
+
+
+def _located(parcel, lon: float, lat: float, distance_m: Optional[float] = None) -> ParcelLocated:
+    return ParcelLocated(
+        **ParcelRead.model_validate(parcel).model_dump(),
+        lon=lon, lat=lat, distance_m=distance_m,
+    )
+
+
+@router.get(
+    "/within",
+    response_model=ParcelLocatedPage,
+    summary="The current user's parcels inside a lon/lat bounding box",
+)
+async def parcels_within_bbox(
+    min_lon: float = Query(..., ge=-180, le=180),
+    min_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    limit: int = Query(1000, ge=1, le=5000),
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Map view: parcels whose centroid falls in the box, with their coordinates."""
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="min_lon/min_lat must not exceed max_lon/max_lat")
+    try:
+        after_id = decode_cursor(cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    rows = await crud_parcel.within_bbox(
+        db,
+        owner_id=current_user.id,
+        min_lon=min_lon, min_lat=min_lat, max_lon=max_lon, max_lat=max_lat,
+        after_id=after_id,
+        limit=limit + 1,
+    )
+    items = [_located(*r) for r in rows[:limit]]
+    next_cursor = encode_cursor(items[-1].id) if len(rows) > limit else None
+    return ParcelLocatedPage(items=items, next_cursor=next_cursor)
+
+
+@router.get(
+    "/near",
+    response_model=ParcelLocatedPage,
+    summary="The current user's parcels within a radius of a point",
+)
+async def parcels_near(
+    lon: float = Query(..., ge=-180, le=180),
+    lat: float = Query(..., ge=-90, le=90),
+    radius_m: float = Query(..., gt=0, le=100_000),
+    limit: int = Query(1000, ge=1, le=5000),
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Parcels whose centroid is within `radius_m` metres, nearest first."""
+    rows = await crud_parcel.near(
+        db, owner_id=current_user.id, lon=lon, lat=lat, radius_m=radius_m, limit=limit
+    )
+    return ParcelLocatedPage(items=[_located(*r) for r in rows])
+
 
 # ------------------------------------------------------------------
 #  1️⃣  Single-parcel lookup
@@ -31,14 +184,25 @@ async def lookup_parcel_utilities(
 ):
     """
     Provide an APN (and optionally a street address) and get back
-    boolean flags for water, power, sewer.
+    boolean flags for water, power, sewer. Results are cached per
+    (apn, county, state); set `refresh` to force a fresh ArcGIS lookup.
     """
-    info = await get_utilities_for_parcel(
-        apn=payload.apn,
-        address=payload.street_address,
-        county=payload.county,
-        state=payload.state,
-    )
+    try:
+        info = await lookup_with_cache(
+            db,
+            apn=payload.apn,
+            address=payload.street_address,
+            county=payload.county,
+            state=payload.state,
+            refresh=payload.refresh,
+            owner_id=current_user.id,
+        )
+    except UpstreamUnavailable as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"County GIS server temporarily unavailable ({exc})",
+            headers={"Retry-After": "30"},
+        ) from exc
     if not info:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -65,20 +229,169 @@ async def upload_parcels_file(
     `apn` and `street_address` columns.  
     Returns a list with `water`, `power`, `sewer` columns added.
     """
-    if file.content_type not in {
-        "text/csv",
-        "application/vnd.ms-excel",
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    }:
+    if file.content_type not in UPLOAD_CONTENT_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File must be CSV or Excel",
         )
 
+    from ....services.csv_processor import parse_stream
+
+    # stream straight off the spooled upload; rows are enriched batch by
+    # batch while the rest of the file is still being parsed
+    rows = []
     try:
-        raw = await file.read()
-        results = await parse_in_memory(raw, file.filename)
+        async for batch in parse_stream(file.file, file.filename):
+            rows.extend(batch)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    return ParcelUtilityList(results=results)
+    return to_utility_list(rows)
+
+
+@router.post(
+    "/upload/enriched",
+    response_class=StreamingResponse,
+    summary="Upload CSV/Excel and download it back with utility columns appended",
+)
+async def upload_parcels_file_enriched(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "xlsx", "parquet"]] = Query(
+        None, description="Output format; defaults to the upload's own (.xls → .xlsx)"
+    ),
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Same input as `/parcels/upload`, but the response is the uploaded sheet
+    itself with the utility columns (and a `utility_error` column) appended.
+    The file is streamed back chunk by chunk as rows are enriched.
+    """
+    if file.content_type not in UPLOAD_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be CSV or Excel",
+        )
+
+    from ....services.enriched_export import (
+        EXPORT_FORMATS,
+        default_format,
+        export_filename,
+        stream_enriched,
+    )
+
+    fmt = format or default_format(file.filename)
+    try:
+        body = stream_enriched(file.file, file.filename, fmt)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename(file.filename, fmt)}"'
+        },
+    )
+
+
+# ------------------------------------------------------------------
+#  3️⃣  Bulk jobs (async upload → poll status → page results)
+# ------------------------------------------------------------------
+@router.post(
+    "/jobs",
+    response_model=BulkJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit a CSV/Excel file for background enrichment",
+)
+async def submit_bulk_job(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Same input format as `/parcels/upload`, but returns a job id right away.
+    Poll `/parcels/jobs/{id}` for progress and fetch rows from
+    `/parcels/jobs/{id}/results` once the job has completed.
+    """
+    if file.content_type not in UPLOAD_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be CSV or Excel",
+        )
+
+    from ....services.csv_processor import iter_rows
+
+    # rows are inserted chunk by chunk as the file is parsed
+    try:
+        job = await crud_bulk_job.create_with_rows(
+            db,
+            owner_id=current_user.id,
+            filename=file.filename,
+            rows=iter_rows(file.file, file.filename),
+        )
+    except ValueError as exc:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    enqueue(RUN_BULK_JOB_TASK, str(job.id))
+    return job_status(job)
+
+
+async def _owned_job(db: AsyncSession, job_id: uuid.UUID, user: User):
+    job = await crud_bulk_job.get_for_owner(db, job_id=job_id, owner_id=user.id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=BulkJobRead,
+    summary="Progress of a bulk job",
+)
+async def read_bulk_job(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    return job_status(await _owned_job(db, job_id, current_user))
+
+
+@router.get(
+    "/jobs/{job_id}/results",
+    response_model=BulkJobResultsPage,
+    summary="Page through the results of a completed bulk job",
+)
+async def read_bulk_job_results(
+    job_id: uuid.UUID,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    job = await _owned_job(db, job_id, current_user)
+    if job.status != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job.status}; results are available once it completes",
+        )
+
+    rows = await crud_bulk_job.get_rows(db, job_id=job_id, offset=offset, limit=limit)
+    results: list[ParcelUtilityInfo] = []
+    errors: list[ParcelRowError] = []
+    for row in rows:
+        if row.result is not None:
+            results.append(ParcelUtilityInfo(**row.result))
+        else:
+            errors.append(ParcelRowError(row=row.row_index, apn=row.apn, detail=row.error or "Unknown error"))
+
+    next_offset = offset + limit
+    return BulkJobResultsPage(
+        job_id=job.id,
+        offset=offset,
+        limit=limit,
+        total_rows=job.total_rows,
+        next_offset=next_offset if next_offset < job.total_rows else None,
+        results=results,
+        errors=errors,
+    )
@@ -1,10 +1,144 @@
 # config/loader.py
 import json
+import logging
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Optional
+
+from slugify import slugify
+
 from .models import CountyCfg, Catalogue
 
-CATALOGUE_PATH = Path(__file__).with_name("utility_endpoints.json")
+log = logging.getLogger(__name__)
+
+CATALOGUE_PATH = Path(os.getenv("CATALOGUE_PATH", str(Path(__file__).with_name("utility_endpoints.json"))))
+CATALOGUE_RECHECK_SECONDS = float(os.getenv("CATALOGUE_RECHECK_SECONDS", "30"))
+
+# suffixes callers commonly tack onto county names ("Lee County", "Orleans Parish")
+_PLACE_SUFFIXES = ("county", "parish", "borough")
+
+
+def load_catalogue(path: Path = CATALOGUE_PATH) -> Catalogue:
+    """Entries without a `name` / `state` take them from their key ('lee_fl')."""
+    raw = json.loads(path.read_text())
+    entries: Catalogue = {}
+    for key, value in raw.items():
+        cfg = CountyCfg(**value)
+        base, _, key_state = key.rpartition("_")
+        cfg.name = cfg.name or base or key
+        cfg.state = cfg.state or key_state
+        entries[key] = cfg
+    return entries
+
+
+@lru_cache(maxsize=8192)
+def alias_key(place: str, state: str) -> str:
+    """Normalised lookup key: 'Lee County', 'lee-county', 'LEE' → 'lee|fl'."""
+    words = slugify(str(place), separator=" ").split()
+    # only a separate trailing word is a suffix: 'Hillsborough' keeps its 'borough'
+    if len(words) > 1 and words[-1] in _PLACE_SUFFIXES:
+        words = words[:-1]
+    return f"{''.join(words)}|{str(state).strip().lower()}"
+
+
+def build_alias_index(entries: Catalogue) -> Dict[str, CountyCfg]:
+    """
+    Map every way a caller may name a county — catalogue key, county name,
+    cities, FIPS code, extra aliases — to its CountyCfg, once per load.
+    """
+    index: Dict[str, CountyCfg] = {}
+
+    def add(name: str, state: str, cfg: CountyCfg, key: str) -> None:
+        k = alias_key(name, state)
+        existing = index.setdefault(k, cfg)
+        if existing is not cfg:
+            log.warning("catalogue alias %r for %s already maps to another county; ignored", name, key)
+
+    for key, cfg in entries.items():
+        base, _, key_state = key.rpartition("_")
+        state = cfg.state or key_state
+        add(base or key, state, cfg, key)
+        if cfg.name:
+            add(cfg.name, state, cfg, key)
+        if cfg.fips:
+            add(cfg.fips, state, cfg, key)
+        for name in (*cfg.cities, *cfg.aliases):
+            add(name, state, cfg, key)
+    return index
+
+
+@dataclass(frozen=True)
+class CatalogueSnapshot:
+    entries: Catalogue
+    aliases: Dict[str, CountyCfg]
+    mtime: float
+
+
+class CatalogueStore:
+    """
+    Lazily loaded, hot-reloadable catalogue. Readers always see one complete
+    snapshot (swapped by a single reference assignment); the file is
+    re-checked at most every CATALOGUE_RECHECK_SECONDS and can be reloaded
+    explicitly (e.g. from a signal). A broken file keeps the old snapshot.
+    """
+
+    def __init__(self, path: Path = CATALOGUE_PATH, recheck: float = CATALOGUE_RECHECK_SECONDS):
+        self.path = path
+        self.recheck = recheck
+        self._snapshot: Optional[CatalogueSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> CatalogueSnapshot:
+        snap = self._snapshot
+        now = time.monotonic()
+        if snap is None or now - self._checked_at >= self.recheck:
+            self._checked_at = now
+            try:
+                mtime = self.path.stat().st_mtime
+            except OSError:
+                mtime = snap.mtime if snap else 0.0
+            if snap is None or mtime != snap.mtime:
+                snap = self.reload()
+        return snap
+
+    def reload(self) -> CatalogueSnapshot:
+        with self._lock:
+            try:
+                mtime = self.path.stat().st_mtime
+                entries = load_catalogue(self.path)
+            except Exception:
+                if self._snapshot is None:
+                    raise
+                log.exception("catalogue reload failed; keeping previous version")
+                return self._snapshot
+            snap = CatalogueSnapshot(entries, build_alias_index(entries), mtime)
+            self._snapshot = snap
+            if self._checked_at == 0.0:
+                self._checked_at = time.monotonic()
+            log.info("catalogue loaded: %d counties, %d aliases", len(entries), len(snap.aliases))
+            return snap
+
+    @property
+    def entries(self) -> Catalogue:
+        return self.get().entries
+
+    def resolve(self, place: Optional[str], state: Optional[str]) -> Optional[CountyCfg]:
+        if not place or not state:
+            return None
+        return self.get().aliases.get(alias_key(place, state))
+
+    def install_reload_signal(self, loop, sig: int = signal.SIGUSR2) -> None:
+        """Reload on `sig` (kill -USR2 <worker pid>) inside a running event loop."""
+        try:
+            loop.add_signal_handler(sig, self.reload)
+        except (NotImplementedError, RuntimeError, ValueError):
+            log.info("catalogue reload signal unavailable on this platform")
+
 
-def load_catalogue() -> Catalogue:
-    raw = json.loads(CATALOGUE_PATH.read_text())
-    return {k: CountyCfg(**v) for k, v in raw.items()}
+catalogue_store = CatalogueStore()   # one global source of truth
@@ -1,14 +1,44 @@
 # config/models.py
 from typing import Dict, List, Any, Optional
-from pydantic import BaseModel, HttpUrl, ValidationError, Field
+from pydantic import BaseModel, HttpUrl, ValidationError, Field, model_validator
+
+class PoolCfg(BaseModel):
+    """Connection pool for one upstream host (layers on the same host share it)."""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    warm_connections: int = 1          # opened at startup by init_http_clients
 
 class LayerCfg(BaseModel):
     url: HttpUrl
     static_params: Dict[str, Any]
     dynamic_params: List[str] = Field(default_factory=list)
     provider_field: str = "UtilityName"
+    # names of sibling layers whose results this layer's query needs
+    # (e.g. territory layers need the centroid from "parcel_layer")
+    depends_on: List[str] = Field(default_factory=list)
+    # shared response cache: fresh for cache_ttl seconds, then served stale
+    # (while revalidating) for cache_stale_ttl more; None → same as cache_ttl
+    cache_ttl: int = 3600
+    cache_stale_ttl: Optional[int] = None
+    # territory layers: answer point-in-polygon from a local snapshot
+    # (services/territory_index) while it is younger than snapshot_max_age
+    snapshot: bool = False
+    snapshot_max_age: int = 30 * 24 * 3600
+    # server-side cap on features per query; sizes batched IN (...) lookups
+    max_record_count: int = 1000
+    # per-host connection pool; see http_client.init_http_clients
+    pool: Optional[PoolCfg] = None
 
 class CountyCfg(BaseModel):
+    # names this county can be looked up by (see config.loader.build_alias_index)
+    name: Optional[str] = None
+    state: Optional[str] = None
+    fips: Optional[str] = None
+    cities: List[str] = Field(default_factory=list)
+    aliases: List[str] = Field(default_factory=list)
+
     id_field: str = "APN" 
     parcel_layer: LayerCfg
     electric_territory_layer: LayerCfg
@@ -17,4 +47,39 @@ class CountyCfg(BaseModel):
     wells_layer: LayerCfg
     # add optional layers as needed, e.g. water_layer: LayerCfg | None = None
 
+    def layers(self) -> Dict[str, LayerCfg]:
+        """All configured layers keyed by field name, in declaration order."""
+        return {
+            name: value
+            for name in type(self).model_fields
+            if isinstance(value := getattr(self, name), LayerCfg)
+        }
+
+    @model_validator(mode="after")
+    def _check_layer_dependencies(self) -> "CountyCfg":
+        layers = self.layers()
+        for name, layer in layers.items():
+            unknown = set(layer.depends_on) - set(layers)
+            if unknown:
+                raise ValueError(f"{name} depends on unknown layer(s): {', '.join(sorted(unknown))}")
+
+        # reject cycles so the lookup scheduler can't deadlock
+        visiting: set[str] = set()
+        done: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Layer dependency cycle through {name}")
+            visiting.add(name)
+            for dep in layers[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in layers:
+            visit(name)
+        return self
+
 Catalogue = Dict[str, CountyCfg]
@@ -0,0 +1,20 @@
+from functools import lru_cache
+
+from .config import settings
+
+BULK_QUEUE = "default"
+
+
+@lru_cache(maxsize=1)
+def celery_client():
+    # Producer-side client only: the API never imports the worker package, it
+    # enqueues by task name onto the queue the worker consumes (-Q default).
+    # Built on first enqueue so API workers don't import celery at startup.
+    from celery import Celery
+
+    return Celery("land_saas_api", broker=settings.REDIS_URL)
+
+
+def enqueue(task_name: str, *args) -> str:
+    result = celery_client().send_task(task_name, args=list(args), queue=BULK_QUEUE)
+    return result.id
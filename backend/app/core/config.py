@@ -8,11 +8,28 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
     REDIS_URL: str = "redis://redis:6379/0"
+
+    # connection pool, per process (4 gunicorn workers → up to 4 × (size + overflow))
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: int = 30                 # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800               # seconds; drop connections older than this
+    DB_POOL_PRE_PING: bool = True             # survive Postgres restarts / failovers
+    DB_STATEMENT_CACHE_SIZE: int = 100        # asyncpg prepared statements; 0 behind pgbouncer
+
+    # optional streaming replica for read-only queries (unset → primary)
+    POSTGRES_REPLICA_SERVER: str | None = None
+    POSTGRES_REPLICA_PORT: int | None = None
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60   # one hour
     BACKEND_CORS_ORIGINS: list[str] = ["*"]
     AUTO_MIGRATE: bool = True
 
+    # persistent lookup cache (shared Parcel rows with owner_id NULL)
+    PARCEL_CACHE_ENABLED: bool = True
+    PARCEL_CACHE_TTL_SECONDS: int = 7 * 24 * 3600        # one week
+    PARCEL_CACHE_NEGATIVE_TTL_SECONDS: int = 3600        # "not found" results
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,20 +1,70 @@
+from typing import Any
+
 from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from .config import settings
 
-DATABASE_URL = (
-    f"postgresql+asyncpg://{settings.POSTGRES_USER}:"
-    f"{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_SERVER}:"
-    f"{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+
+def _url(server: str, port: int) -> str:
+    return (
+        f"postgresql+asyncpg://{settings.POSTGRES_USER}:"
+        f"{settings.POSTGRES_PASSWORD}@{server}:{port}/{settings.POSTGRES_DB}"
+    )
+
+
+DATABASE_URL = _url(settings.POSTGRES_SERVER, settings.POSTGRES_PORT)
+REPLICA_URL = (
+    _url(settings.POSTGRES_REPLICA_SERVER, settings.POSTGRES_REPLICA_PORT or settings.POSTGRES_PORT)
+    if settings.POSTGRES_REPLICA_SERVER
+    else None
 )
 
-engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+# asyncpg options shared by every engine, including the worker's NullPool ones
+CONNECT_ARGS = {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+
+
+def _engine(url: str):
+    return create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=CONNECT_ARGS,
+    )
+
+
+engine = _engine(DATABASE_URL)
+replica_engine = _engine(REPLICA_URL) if REPLICA_URL else None
+
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
+
+def read_bind() -> dict[str, Any]:
+    """
+    bind_arguments for read-only CRUD queries that tolerate replica lag:
+    `await db.execute(stmt, bind_arguments=read_bind())`. The statement then
+    runs on the replica inside the same session; without a replica it is a
+    no-op. Don't use it for reads that must see the session's own writes.
+    """
+    if replica_engine is None:
+        return {}
+    return {"bind": replica_engine.sync_engine}
+
+
+async def dispose_engines() -> None:
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+
+
 async def get_session() -> AsyncSession:
     """FastAPI dependency that yields an AsyncSession."""
     async with AsyncSessionLocal() as session:
@@ -0,0 +1,132 @@
+# app/core/migrations.py
+"""
+Single-leader startup migrations.
+
+Every gunicorn worker runs the app lifespan, so with AUTO_MIGRATE each one
+would run `alembic upgrade head` at once. Instead:
+
+1. fast path – compare alembic_version with the heads of the version
+   files; if the database is already at head, Alembic is never loaded;
+2. otherwise workers race for a Postgres advisory lock; the winner runs
+   the upgrade in a thread, the rest poll (asyncio.sleep, so the event loop
+   stays free) until the database reaches head or they get the lock
+   themselves.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import pathlib
+import re
+import time
+import zlib
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .config import settings
+from .database import DATABASE_URL, engine
+
+log = logging.getLogger(__name__)
+
+# ---------- Tunables via env ----------
+MIGRATION_LOCK_TIMEOUT = float(os.getenv("MIGRATION_LOCK_TIMEOUT", "300"))   # seconds
+MIGRATION_POLL_SECONDS = float(os.getenv("MIGRATION_POLL_SECONDS", "0.5"))
+
+BACKEND_DIR = pathlib.Path(__file__).resolve().parents[2]
+# pg advisory locks take a bigint; any fixed value unique to this app will do
+MIGRATION_LOCK_KEY = zlib.crc32(f"{settings.PROJECT_NAME}:alembic".encode())
+
+
+def _alembic_config():
+    import alembic.config
+
+    ini = BACKEND_DIR / "alembic.ini"
+    cfg = alembic.config.Config(str(ini) if ini.exists() else None)
+    if not cfg.get_main_option("script_location"):
+        cfg.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    if not cfg.get_main_option("sqlalchemy.url"):
+        # env.py uses a sync engine
+        cfg.set_main_option(
+            "sqlalchemy.url",
+            DATABASE_URL.replace("+asyncpg", "+psycopg2").replace("%", "%%"),
+        )
+    return cfg
+
+
+_REVISION_RE = re.compile(r"^revision\b[^=]*=\s*['\"](\w+)['\"]", re.M)
+_DOWN_REVISION_RE = re.compile(r"^down_revision\b[^=]*=(.*)$", re.M)
+
+
+def _script_revisions() -> tuple[set[str], set[str]]:
+    """
+    (heads, every known revision), read straight from the version files'
+    `revision` / `down_revision` lines so the fast path needn't load Alembic
+    or import the migrations.
+    """
+    known: set[str] = set()
+    parents: set[str] = set()
+    for path in (BACKEND_DIR / "alembic" / "versions").glob("*.py"):
+        source = path.read_text()
+        rev = _REVISION_RE.search(source)
+        if not rev:
+            continue
+        known.add(rev.group(1))
+        down = _DOWN_REVISION_RE.search(source)
+        if down:
+            parents.update(re.findall(r"['\"](\w+)['\"]", down.group(1)))
+    return known - parents, known
+
+
+def _upgrade() -> None:
+    import alembic.command
+
+    alembic.command.upgrade(_alembic_config(), "head")
+
+
+async def _current_revisions(conn: AsyncConnection) -> set[str]:
+    exists = await conn.scalar(text("SELECT to_regclass('alembic_version')"))
+    if exists is None:
+        return set()
+    rows = await conn.execute(text("SELECT version_num FROM alembic_version"))
+    return {r[0] for r in rows}
+
+
+async def ensure_migrated() -> None:
+    """Bring the database to head, with at most one process running Alembic."""
+    heads, known = _script_revisions()
+    deadline = time.monotonic() + MIGRATION_LOCK_TIMEOUT
+
+    # AUTOCOMMIT: the advisory lock is session-level and outlives statements
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        waited = False
+        while True:
+            current = await _current_revisions(conn)
+            if current - known:
+                # a newer release already migrated (rolling deploy); nothing we can do
+                log.warning("database is at %s, unknown to this build; skipping migrations",
+                            ", ".join(sorted(current - known)))
+                return
+            if current == heads:
+                if waited:
+                    log.info("database reached %s (migrated by another process)", ", ".join(heads))
+                return
+
+            if await conn.scalar(text("SELECT pg_try_advisory_lock(:k)"), {"k": MIGRATION_LOCK_KEY}):
+                try:
+                    # the previous holder may have finished just before we got the lock
+                    if await _current_revisions(conn) != heads:
+                        log.info("running migrations to %s", ", ".join(heads))
+                        await asyncio.to_thread(_upgrade)
+                    return
+                finally:
+                    await conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": MIGRATION_LOCK_KEY})
+
+            if time.monotonic() >= deadline:
+                raise RuntimeError(
+                    f"timed out after {MIGRATION_LOCK_TIMEOUT:.0f}s waiting for migrations to reach head"
+                )
+            waited = True
+            await asyncio.sleep(MIGRATION_POLL_SECONDS)
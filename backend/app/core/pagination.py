@@ -0,0 +1,33 @@
+# app/core/pagination.py
+"""
+Opaque keyset cursors.
+
+List endpoints page on the primary key ("everything after id N") instead
+of OFFSET, so every page costs one index range scan however deep it is.
+The cursor is the last id of the previous page, base64url-encoded so
+clients treat it as a token rather than a number to do arithmetic on.
+"""
+import base64
+import json
+from typing import Optional
+
+_VERSION = 1
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps([_VERSION, last_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Last id of the previous page, None for the first page; ValueError if malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        version, last_id = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if version != _VERSION or type(last_id) is not int:
+        raise ValueError("Invalid cursor")
+    return last_id
@@ -0,0 +1,154 @@
+# app/core/principal_cache.py
+"""
+Short-lived cache of authenticated principals.
+
+get_current_user still verifies the JWT on every request, but the user row
+behind it is cached per (user id, token) so most requests skip the SELECT.
+Two tiers: a small in-process LRU, and optionally Redis so a login seen by
+one worker warms the others. crud_user.update / remove invalidate a user
+in both tiers; other processes' local tiers converge within
+PRINCIPAL_CACHE_LOCAL_TTL.
+
+Redis is best-effort: failures fall through to the database.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from .config import settings
+from ..models.user import User
+
+log = logging.getLogger(__name__)
+
+# ---------- Tunables via env ----------
+PRINCIPAL_CACHE_ENABLED   = os.getenv("PRINCIPAL_CACHE_ENABLED", "true").lower() in {"1", "true", "yes"}
+PRINCIPAL_CACHE_LOCAL_TTL = float(os.getenv("PRINCIPAL_CACHE_LOCAL_TTL", "15"))
+PRINCIPAL_CACHE_TTL       = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))      # Redis tier
+PRINCIPAL_CACHE_MAX       = int(os.getenv("PRINCIPAL_CACHE_MAX", "10000"))
+PRINCIPAL_CACHE_REDIS     = os.getenv("PRINCIPAL_CACHE_REDIS", "false").lower() in {"1", "true", "yes"}
+PRINCIPAL_CACHE_PREFIX    = os.getenv("PRINCIPAL_CACHE_PREFIX", "principal:v1:")
+
+# never leaves the database
+_EXCLUDED = {"hashed_password"}
+
+# (user_id, token digest) -> (expires_at, fields)
+_local: "OrderedDict[tuple[int, str], tuple[float, dict[str, Any]]]" = OrderedDict()
+_redis: Any = None
+
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def _redis_key(user_id: int) -> str:
+    return f"{PRINCIPAL_CACHE_PREFIX}{user_id}"
+
+
+def _client() -> Any:
+    global _redis
+    if _redis is None:
+        import redis.asyncio as aioredis
+        _redis = aioredis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+def _to_fields(user: User) -> dict[str, Any]:
+    return user.model_dump(mode="json", exclude=_EXCLUDED)
+
+
+def _to_user(fields: dict[str, Any]) -> User:
+    # detached with its identity, so a session can db.add() it and UPDATE
+    # only what changed; hashed_password is not carried
+    user = User.model_validate({**fields, "hashed_password": ""})
+    make_transient_to_detached(user)
+    return user
+
+
+async def get(user_id: int, token: str, token_exp: Optional[float] = None) -> Optional[User]:
+    if not PRINCIPAL_CACHE_ENABLED:
+        return None
+    key = (user_id, _digest(token))
+    now = time.time()
+
+    hit = _local.get(key)
+    if hit is not None:
+        if hit[0] > now:
+            _local.move_to_end(key)
+            return _to_user(hit[1])
+        del _local[key]
+
+    if not PRINCIPAL_CACHE_REDIS:
+        return None
+    try:
+        raw = await _client().hget(_redis_key(user_id), key[1])
+    except Exception as exc:
+        log.debug("principal cache read failed: %s", exc)
+        return None
+    if raw is None:
+        return None
+    cached_at, fields = json.loads(raw)
+    if cached_at + PRINCIPAL_CACHE_TTL <= now:
+        return None
+    _remember(key, fields, now, token_exp)
+    return _to_user(fields)
+
+
+def _remember(key: tuple[int, str], fields: dict[str, Any], now: float, token_exp: Optional[float]) -> None:
+    expires = now + PRINCIPAL_CACHE_LOCAL_TTL
+    if token_exp is not None:
+        expires = min(expires, token_exp)
+    _local[key] = (expires, fields)
+    _local.move_to_end(key)
+    while len(_local) > PRINCIPAL_CACHE_MAX:
+        _local.popitem(last=False)
+
+
+async def put(user: User, token: str, token_exp: Optional[float] = None) -> None:
+    if not PRINCIPAL_CACHE_ENABLED or not user.is_active:
+        return
+    key = (user.id, _digest(token))
+    fields = _to_fields(user)
+    now = time.time()
+    _remember(key, fields, now, token_exp)
+
+    if not PRINCIPAL_CACHE_REDIS:
+        return
+    ttl = PRINCIPAL_CACHE_TTL
+    if token_exp is not None:
+        ttl = max(1, min(ttl, int(token_exp - now)))
+    try:
+        redis = _client()
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(_redis_key(user.id), key[1], json.dumps([now, fields]))
+            pipe.expire(_redis_key(user.id), ttl)
+            await pipe.execute()
+    except Exception as exc:
+        log.debug("principal cache write failed: %s", exc)
+
+
+async def invalidate(user_id: int) -> None:
+    """Drop every cached token of `user_id` (both tiers)."""
+    for key in [k for k in _local if k[0] == user_id]:
+        _local.pop(key, None)
+    if not PRINCIPAL_CACHE_REDIS:
+        return
+    try:
+        await _client().delete(_redis_key(user_id))
+    except Exception as exc:
+        log.warning("principal cache invalidation failed for user %s: %s", user_id, exc)
+
+
+async def close() -> None:
+    global _redis
+    _local.clear()
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
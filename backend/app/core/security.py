@@ -1,18 +1,111 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from .config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# ---------- Tunables via env ----------
+BCRYPT_ROUNDS             = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS     = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# calls allowed to wait for a worker before new ones are refused
+PASSWORD_HASH_MAX_QUEUE   = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+log = logging.getLogger(__name__)
+
+# hashes made with other rounds are "deprecated" and get rehashed on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+T = TypeVar("T")
+
+
+class PasswordHashBusy(RuntimeError):
+    """Too many password hashes queued; the caller should retry later."""
+
+
+class _HashPool:
+    """
+    bcrypt runs ~250 ms per call; doing it on the event loop stalls every
+    other request in the worker. Calls go to a small dedicated thread pool
+    (bcrypt releases the GIL) and the number waiting for a thread is tracked
+    and capped.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0            # queued + running
+        self.peak_queued = 0
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        return max(self.in_flight - self.workers, 0)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise PasswordHashBusy(f"{self.queued} password hashes queued")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="pwhash")
+
+        self.in_flight += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+_hash_pool = _HashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
+
+
+def hash_pool_stats() -> dict[str, int]:
+    return _hash_pool.stats()
+
+
+def close_hash_pool() -> None:
+    log.info("password hash pool stats: %s", _hash_pool.stats())
+    _hash_pool.shutdown()
+
 
 def create_access_token(subject: str, expires_delta: int | None = None) -> str:
     delta = timedelta(minutes=expires_delta or settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {"sub": subject, "exp": datetime.utcnow() + delta}
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
 
+# sync variants block for the full bcrypt cost; use them only off the event loop
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def hash_password(password: str) -> str:
+    return await _hash_pool.run(pwd_context.hash, password)
+
+async def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """
+    (valid, new_hash). new_hash is set when `hashed` was made with outdated
+    parameters (e.g. BCRYPT_ROUNDS changed) and should replace the stored one.
+    """
+    return await _hash_pool.run(pwd_context.verify_and_update, plain, hashed)
@@ -0,0 +1,178 @@
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlmodel import select
+from sqlalchemy import func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.bulk_job import BulkJob, BulkJobRow
+
+# rows per INSERT statement when a job is created
+_INSERT_CHUNK = 1000
+
+
+def _as_str(v: Any) -> Optional[str]:
+    if v is None or (isinstance(v, float) and v != v):   # NaN from pandas
+        return None
+    return str(v)
+
+
+class CRUDBulkJob:
+    # ---------- basic getters ----------
+    async def get(self, db: AsyncSession, job_id: uuid.UUID) -> Optional[BulkJob]:
+        return await db.get(BulkJob, job_id)
+
+    async def get_for_owner(
+        self, db: AsyncSession, *, job_id: uuid.UUID, owner_id: int
+    ) -> Optional[BulkJob]:
+        job = await self.get(db, job_id)
+        if job is None or job.owner_id != owner_id:
+            return None
+        return job
+
+    async def get_rows(
+        self, db: AsyncSession, *, job_id: uuid.UUID, offset: int = 0, limit: int = 500
+    ) -> List[BulkJobRow]:
+        # range on (job_id, row_index) hits the unique index; no OFFSET scan
+        result = await db.execute(
+            select(BulkJobRow)
+            .where(BulkJobRow.job_id == job_id)
+            .where(BulkJobRow.row_index >= offset)
+            .where(BulkJobRow.row_index < offset + limit)
+            .order_by(BulkJobRow.row_index)
+        )
+        return result.scalars().all()
+
+    async def get_pending_rows(
+        self, db: AsyncSession, *, job_id: uuid.UUID, limit: int
+    ) -> List[BulkJobRow]:
+        """
+        Claim up to `limit` unfinished rows. They stay locked until the next
+        commit and SKIP LOCKED passes over rows another run of the same job
+        holds, so a redelivered task doesn't look up the same page again.
+        """
+        result = await db.execute(
+            select(BulkJobRow)
+            .where(BulkJobRow.job_id == job_id)
+            .where(BulkJobRow.done == False)  # noqa: E712
+            .order_by(BulkJobRow.row_index)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return result.scalars().all()
+
+    async def count_pending(self, db: AsyncSession, *, job_id: uuid.UUID) -> int:
+        result = await db.execute(
+            select(func.count())
+            .select_from(BulkJobRow)
+            .where(BulkJobRow.job_id == job_id)
+            .where(BulkJobRow.done == False)  # noqa: E712
+        )
+        return result.scalar_one()
+
+    # ---------- create / update ----------
+    async def create_with_rows(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        filename: Optional[str],
+        rows: Iterable[Dict[str, Any]],
+    ) -> BulkJob:
+        """`rows` may be a lazy iterator; only one chunk is held at a time."""
+        job = BulkJob(owner_id=owner_id, filename=filename)
+        db.add(job)
+        await db.flush()
+
+        it = iter(rows)
+        start = 0
+        while chunk := list(islice(it, _INSERT_CHUNK)):
+            await db.execute(
+                insert(BulkJobRow),
+                [
+                    {
+                        "job_id": job.id,
+                        "row_index": start + i,
+                        "apn": _as_str(r.get("apn")),
+                        "street_address": _as_str(r.get("street_address")),
+                        "county": _as_str(r.get("county")),
+                        "state": _as_str(r.get("state")),
+                        "done": False,
+                    }
+                    for i, r in enumerate(chunk)
+                ],
+            )
+            start += len(chunk)
+
+        job.total_rows = start
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def record_results(
+        self,
+        db: AsyncSession,
+        *,
+        job: BulkJob,
+        results: List[Dict[str, Any]],
+    ) -> BulkJob:
+        """
+        Persist one processed batch. `results` items carry the row `id`
+        plus `result` (dict) or `error` (str). Only rows still pending are
+        written and counted, so a batch another run of the job already
+        recorded isn't counted twice; the job's counters are incremented
+        in SQL for the same reason.
+        """
+        if not results:
+            return job
+        claimed = set((await db.execute(
+            update(BulkJobRow)
+            .where(BulkJobRow.id.in_([r["id"] for r in results]))
+            .where(BulkJobRow.done == False)  # noqa: E712
+            .values(done=True)
+            .returning(BulkJobRow.id)
+        )).scalars())
+        mine = [r for r in results if r["id"] in claimed]
+        if mine:
+            await db.execute(
+                update(BulkJobRow),
+                [{"id": r["id"], "result": r.get("result"), "error": r.get("error")} for r in mine],
+            )
+            failed = sum(1 for r in mine if r.get("error"))
+            await db.execute(
+                update(BulkJob)
+                .where(BulkJob.id == job.id)
+                .values(
+                    rows_done=BulkJob.rows_done + (len(mine) - failed),
+                    rows_failed=BulkJob.rows_failed + failed,
+                )
+            )
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def set_status(
+        self,
+        db: AsyncSession,
+        *,
+        job: BulkJob,
+        status: str,
+        error: Optional[str] = None,
+    ) -> BulkJob:
+        job.status = status
+        if status == "running" and job.started_at is None:
+            job.started_at = datetime.utcnow()
+        if status in {"completed", "failed"}:
+            job.finished_at = datetime.utcnow()
+        if error is not None:
+            job.error = error
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+
+crud_bulk_job = CRUDBulkJob()
@@ -1,19 +1,48 @@
-from typing import Optional, List
+import json
+from datetime import datetime
+from math import cos, radians
+from itertools import count
+from typing import Any, Dict, Iterable, Mapping, Optional, List
 
 from sqlmodel import select
+from sqlalchemy import Float, cast, func, text, update
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import ColumnElement
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.database import read_bind
 from ..models.parcel import Parcel
 from ..schemas.parcel import ParcelCreate, ParcelUpdate
 
 
+def _point(point: Optional[tuple[float, float]]) -> Optional[ColumnElement]:
+    if point is None:
+        return None
+    return func.ST_SetSRID(func.ST_MakePoint(point[0], point[1]), 4326)
+
+
 class CRUDParcel:
     # ---------- basic getters ----------
     async def get(self, db: AsyncSession, parcel_id: int) -> Optional[Parcel]:
         return await db.get(Parcel, parcel_id)
 
-    async def get_by_apn(self, db: AsyncSession, apn: str) -> Optional[Parcel]:
-        result = await db.execute(select(Parcel).where(Parcel.apn == apn))
+    async def get_by_apn(
+        self, db: AsyncSession, *, owner_id: int, apn: str, county: str, state: str
+    ) -> Optional[Parcel]:
+        """
+        The owner's parcel with this key (uq_parcel_owner_key). An APN alone
+        isn't unique: other owners and the shared lookup cache (owner_id
+        NULL) hold rows for it too. Reads the primary, as it is typically
+        used to check for a parcel before writing one.
+        """
+        result = await db.execute(
+            select(Parcel)
+            .where(Parcel.owner_id == owner_id)
+            .where(Parcel.apn == apn)
+            .where(Parcel.county == county)
+            .where(Parcel.state == state)
+        )
         return result.scalar_one_or_none()
 
     async def get_multi_by_owner(
@@ -21,16 +50,268 @@ class CRUDParcel:
         db: AsyncSession,
         *,
         owner_id: int,
-        skip: int = 0,
+        after_id: Optional[int] = None,
         limit: int = 100,
     ) -> List[Parcel]:
+        """
+        One keyset page of the owner's parcels in id order: rows with
+        id > after_id, served by ix_parcel_owner_id_id (owner_id, id).
+        """
+        stmt = select(Parcel).where(Parcel.owner_id == owner_id)
+        if after_id is not None:
+            stmt = stmt.where(Parcel.id > after_id)
         result = await db.execute(
-            select(Parcel)
+            stmt.order_by(Parcel.id).limit(limit),
+            bind_arguments=read_bind(),
+        )
+        return result.scalars().all()
+
+    async def query_by_utilities(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        match: Dict[str, Any],
+        after_id: Optional[int] = None,
+        limit: int = 100,
+    ) -> List[Parcel]:
+        """
+        Keyset page of the owner's parcels whose stored utility result
+        contains every key/value in `match` (`data @> match`, served by
+        the ix_parcel_data GIN index).
+        """
+        stmt = select(Parcel).where(Parcel.owner_id == owner_id)
+        if match:
+            stmt = stmt.where(Parcel.data.contains(match))
+        if after_id is not None:
+            stmt = stmt.where(Parcel.id > after_id)
+        result = await db.execute(
+            stmt.order_by(Parcel.id).limit(limit),
+            bind_arguments=read_bind(),
+        )
+        return result.scalars().all()
+
+    # ---------- spatial search (owner's parcels) ----------
+    def _located(self, owner_id: int):
+        return (
+            select(
+                Parcel,
+                cast(func.ST_X(Parcel.centroid), Float).label("lon"),
+                cast(func.ST_Y(Parcel.centroid), Float).label("lat"),
+            )
             .where(Parcel.owner_id == owner_id)
-            .offset(skip)
+            .where(Parcel.centroid.is_not(None))
+        )
+
+    async def within_bbox(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        min_lon: float,
+        min_lat: float,
+        max_lon: float,
+        max_lat: float,
+        after_id: Optional[int] = None,
+        limit: int = 1000,
+    ) -> List[tuple[Parcel, float, float]]:
+        """Keyset page of (parcel, lon, lat) whose centroid lies in the box (GiST)."""
+        envelope = func.ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326)
+        stmt = self._located(owner_id).where(func.ST_Intersects(Parcel.centroid, envelope))
+        if after_id is not None:
+            stmt = stmt.where(Parcel.id > after_id)
+        result = await db.execute(
+            stmt.order_by(Parcel.id).limit(limit), bind_arguments=read_bind()
+        )
+        return [tuple(r) for r in result.all()]
+
+    async def near(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        lon: float,
+        lat: float,
+        radius_m: float,
+        limit: int = 1000,
+    ) -> List[tuple[Parcel, float, float, float]]:
+        """
+        (parcel, lon, lat, distance_m) within `radius_m` metres, nearest first.
+        A degree-based ST_DWithin on the geometry uses the GiST index; the
+        geography ST_DWithin then applies the exact metric radius.
+        """
+        origin = func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
+        # over-approximate: a degree of latitude is ≥ 110.5 km, of longitude ≥ that × cos(lat)
+        pad_deg = radius_m / (110_000 * max(cos(radians(min(abs(lat), 89.0))), 0.01))
+        distance = func.ST_Distance(
+            func.Geography(Parcel.centroid), func.Geography(origin)
+        )
+        stmt = (
+            self._located(owner_id)
+            .add_columns(cast(distance, Float).label("distance_m"))
+            .where(func.ST_DWithin(Parcel.centroid, origin, pad_deg))
+            .where(func.ST_DWithin(func.Geography(Parcel.centroid), func.Geography(origin), radius_m))
+            .order_by(distance)
             .limit(limit)
         )
-        return result.scalars().all()
+        result = await db.execute(stmt, bind_arguments=read_bind())
+        return [tuple(r) for r in result.all()]
+
+    # ---------- shared lookup cache ----------
+    async def get_cached(
+        self, db: AsyncSession, *, apn: str, county: str, state: str
+    ) -> Optional[Parcel]:
+        result = await db.execute(
+            select(Parcel)
+            .where(Parcel.owner_id.is_(None))
+            .where(Parcel.apn == apn)
+            .where(Parcel.county == county)
+            .where(Parcel.state == state)
+        )
+        return result.scalar_one_or_none()
+
+    async def upsert_cached(
+        self,
+        db: AsyncSession,
+        *,
+        apn: str,
+        county: str,
+        state: str,
+        street_address: Optional[str],
+        data: Dict[str, Any],
+        point: Optional[tuple[float, float]] = None,
+    ) -> None:
+        now = datetime.utcnow()
+        stmt = pg_insert(Parcel).values(
+            apn=apn,
+            county=county,
+            state=state,
+            street_address=street_address,
+            data=data,
+            centroid=_point(point),
+            owner_id=None,
+            created_at=now,
+            updated_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["apn", "county", "state"],
+            index_where=text("owner_id IS NULL"),
+            set_={
+                "data": stmt.excluded.data,
+                "street_address": stmt.excluded.street_address,
+                "centroid": func.coalesce(stmt.excluded.centroid, Parcel.centroid),
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+    async def copy_cached_centroid(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        apn: str,
+        county: str,
+        state: str,
+        cache_key: tuple[str, str, str],
+        only_missing: bool = False,
+    ) -> None:
+        """
+        Give the owner's parcel (apn, county, state as the owner stored it)
+        the centroid of its lookup-cache row. Nothing happens when the owner
+        has no such parcel, the cache has no point, or they already agree;
+        with `only_missing`, also when the owner's parcel has any centroid.
+        Commits only when a row changed.
+        """
+        cached = aliased(Parcel)
+        stmt = (
+            update(Parcel)
+            .where(Parcel.owner_id == owner_id)
+            .where(Parcel.apn == apn)
+            .where(Parcel.county == county)
+            .where(Parcel.state == state)
+            .where(cached.owner_id.is_(None))
+            .where(cached.apn == cache_key[0])
+            .where(cached.county == cache_key[1])
+            .where(cached.state == cache_key[2])
+            .where(cached.centroid.is_not(None))
+            .values(centroid=cached.centroid)
+        )
+        if only_missing:
+            stmt = stmt.where(Parcel.centroid.is_(None))
+        else:
+            stmt = stmt.where(Parcel.centroid.is_distinct_from(cached.centroid))
+        result = await db.execute(stmt)
+        if result.rowcount:
+            await db.commit()
+
+    # ---------- bulk persistence ----------
+    _STAGE_COLUMNS = [
+        "seq", "apn", "county", "state", "owner_name", "street_address", "city", "data", "lon", "lat",
+    ]
+
+    async def bulk_upsert(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        rows: Iterable[Mapping[str, Any]],
+    ) -> int:
+        """
+        Set-based upsert of many parcels for one owner, keyed on
+        (owner_id, apn, county, state). Rows are COPYed into a temp staging
+        table and merged with a single INSERT … ON CONFLICT, in one
+        transaction. When a key repeats in `rows` the last one wins.
+        An optional `point` (lon, lat) fills the centroid column.
+        Returns the number of parcels inserted or updated.
+        """
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        apg = raw.driver_connection                 # asyncpg.Connection
+
+        await db.execute(text(
+            "CREATE TEMP TABLE parcel_stage ("
+            " seq integer, apn text, county text, state text, owner_name text,"
+            " street_address text, city text, data jsonb,"
+            " lon double precision, lat double precision"
+            ") ON COMMIT DROP"
+        ))
+        seq = count()
+        await apg.copy_records_to_table(
+            "parcel_stage",
+            columns=self._STAGE_COLUMNS,
+            records=(
+                (
+                    next(seq), r["apn"], r["county"], r["state"],
+                    r.get("owner_name"), r.get("street_address"), r.get("city"),
+                    json.dumps(r["data"]) if r.get("data") is not None else None,
+                    *(r.get("point") or (None, None)),
+                )
+                for r in rows
+            ),
+        )
+        result = await db.execute(
+            text(
+                "INSERT INTO parcel (owner_id, apn, county, state, owner_name,"
+                " street_address, city, data, centroid, created_at, updated_at) "
+                "SELECT DISTINCT ON (apn, county, state) CAST(:owner_id AS integer), apn, county,"
+                " state, owner_name, street_address, city, data,"
+                " ST_SetSRID(ST_MakePoint(lon, lat), 4326),"
+                " CAST(:now AS timestamp), CAST(:now AS timestamp) "
+                "FROM parcel_stage ORDER BY apn, county, state, seq DESC "
+                "ON CONFLICT ON CONSTRAINT uq_parcel_owner_key DO UPDATE SET"
+                " owner_name = COALESCE(EXCLUDED.owner_name, parcel.owner_name),"
+                " street_address = COALESCE(EXCLUDED.street_address, parcel.street_address),"
+                " city = COALESCE(EXCLUDED.city, parcel.city),"
+                " data = EXCLUDED.data,"
+                " centroid = COALESCE(EXCLUDED.centroid, parcel.centroid),"
+                " updated_at = EXCLUDED.updated_at"
+            ),
+            {"owner_id": owner_id, "now": datetime.utcnow()},
+        )
+        await db.commit()
+        return result.rowcount
 
     # ---------- create / update / delete ----------
     async def create(
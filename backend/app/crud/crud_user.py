@@ -5,7 +5,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.user import User
 from ..schemas.user import UserCreate, UserUpdate
-from ..core.security import get_password_hash, verify_password
+from ..core import principal_cache
+from ..core.database import read_bind
+from ..core.security import hash_password, verify_and_update_password
 
 
 class CRUDUser:
@@ -18,16 +20,22 @@ class CRUDUser:
         return result.scalar_one_or_none()
 
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self, db: AsyncSession, *, after_id: Optional[int] = None, limit: int = 100
     ) -> List[User]:
-        result = await db.execute(select(User).offset(skip).limit(limit))
+        """One keyset page of users in id order (rows with id > after_id)."""
+        stmt = select(User)
+        if after_id is not None:
+            stmt = stmt.where(User.id > after_id)
+        result = await db.execute(
+            stmt.order_by(User.id).limit(limit), bind_arguments=read_bind()
+        )
         return result.scalars().all()
 
     # ---------- create / update / delete ----------
     async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
         db_obj = User(
             email=obj_in.email,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=await hash_password(obj_in.password),
             full_name=obj_in.full_name,
         )
         db.add(db_obj)
@@ -44,13 +52,14 @@ class CRUDUser:
     ) -> User:
         update_data = obj_in.model_dump(exclude_unset=True)
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+            update_data["hashed_password"] = await hash_password(update_data.pop("password"))
 
         for field, value in update_data.items():
             setattr(db_obj, field, value)
 
         db.add(db_obj)
         await db.commit()
+        await principal_cache.invalidate(db_obj.id)   # e.g. is_active just went False
         await db.refresh(db_obj)
         return db_obj
 
@@ -59,6 +68,7 @@ class CRUDUser:
         if obj:
             await db.delete(obj)
             await db.commit()
+            await principal_cache.invalidate(user_id)
         return obj
 
     # ---------- auth helper ----------
@@ -66,8 +76,17 @@ class CRUDUser:
         self, db: AsyncSession, *, email: str, password: str
     ) -> Optional[User]:
         user = await self.get_by_email(db, email)
-        if not user or not verify_password(password, user.hashed_password):
+        if not user:
+            return None
+        valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            # stored hash used outdated bcrypt parameters; upgrade it in place
+            user.hashed_password = new_hash
+            db.add(user)
+            await db.commit()
+            await db.refresh(user)
         return user
 
 
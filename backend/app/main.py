@@ -1,25 +1,64 @@
 import os
+import asyncio
+import importlib
+import logging
 
 from contextlib import asynccontextmanager
 from .services.http_client import init_http_clients, close_http_clients
+from .config.loader import catalogue_store
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import settings
+from .core.security import close_hash_pool
+from .core import principal_cache
 from .api.v1.api import api_router
 from .models import base
-from .core.database import engine
+from .core.database import dispose_engines
+from .core.migrations import ensure_migrated
 
 origins = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173").split(",")
 
+log = logging.getLogger(__name__)
+
+# Heavy modules only the file endpoints need (pandas, openpyxl, pyarrow).
+# They are not imported at module load; once the worker is serving, a
+# background thread imports them so the first upload doesn't pay for it.
+IMPORT_WARMUP = os.getenv("IMPORT_WARMUP", "true").lower() in {"1", "true", "yes"}
+WARMUP_MODULES = (
+    ".services.csv_processor",
+    ".services.enriched_export",
+    ".services.columnar",
+    "openpyxl",
+    "pyarrow.parquet",
+)
+
+
+def _warm_imports() -> None:
+    for name in WARMUP_MODULES:
+        try:
+            importlib.import_module(name, __package__)
+        except Exception as exc:   # warm-up is best-effort; first use will raise properly
+            log.warning("import warm-up of %s failed: %s", name, exc)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # startup
+    if settings.AUTO_MIGRATE:
+        # one process migrates (advisory lock); the others wait without blocking the loop
+        await ensure_migrated()
+    catalogue_store.install_reload_signal(asyncio.get_running_loop())
     await init_http_clients()
+    warmup = asyncio.create_task(asyncio.to_thread(_warm_imports)) if IMPORT_WARMUP else None
     try:
         yield
     finally:
         # shutdown
+        if warmup is not None and not warmup.done():
+            warmup.cancel()
         await close_http_clients()
+        close_hash_pool()
+        await principal_cache.close()
+        await dispose_engines()
 
 def create_app() -> FastAPI:
     app = FastAPI(title="Land-SaaS", version="1.0.0", lifespan=lifespan)
@@ -35,14 +74,6 @@ def create_app() -> FastAPI:
 
     app.include_router(api_router, prefix="/api/v1")
 
-    @app.on_event("startup")
-    async def on_startup() -> None:
-        # run migrations automatically in dev
-        if settings.AUTO_MIGRATE:
-            import alembic.config, pathlib, os
-            cfg = alembic.config.Config(str(pathlib.Path(__file__).parent.parent / "alembic.ini"))
-            alembic.command.upgrade(cfg, "head")
-
     return app
 
 app = create_app()
@@ -1,2 +1,3 @@
 from .user import User  # noqa
 from .parcel import Parcel  # noqa
+from .bulk_job import BulkJob, BulkJobRow  # noqa
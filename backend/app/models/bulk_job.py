@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import Column, Index, UniqueConstraint, text
+
+
+class BulkJob(SQLModel, table=True):
+    __tablename__ = "bulk_jobs"
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    owner_id: Optional[int] = Field(default=None, foreign_key="users.id", index=True)
+    filename: Optional[str] = None
+    status: str = Field(default="queued", nullable=False)  # queued | running | completed | failed
+    total_rows: int = 0
+    rows_done: int = 0
+    rows_failed: int = 0
+    error: Optional[str] = None
+
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class BulkJobRow(SQLModel, table=True):
+    """One uploaded input row plus its enrichment result (or error)."""
+    __tablename__ = "bulk_job_rows"
+    __table_args__ = (
+        UniqueConstraint("job_id", "row_index", name="uq_bulk_job_rows_job_row"),
+        Index("ix_bulk_job_rows_pending", "job_id", "row_index", postgresql_where=text("NOT done")),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    job_id: uuid.UUID = Field(foreign_key="bulk_jobs.id", nullable=False, ondelete="CASCADE")
+    row_index: int = Field(nullable=False)
+    apn: Optional[str] = None
+    street_address: Optional[str] = None
+    county: Optional[str] = None
+    state: Optional[str] = None
+    done: bool = Field(default=False, nullable=False)
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB))
+    error: Optional[str] = None
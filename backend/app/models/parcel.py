@@ -3,10 +3,31 @@ from typing import Optional, Dict, Any
 
 from sqlmodel import SQLModel, Field, JSON
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy import Column
+from geoalchemy2 import Geometry
+from sqlalchemy import Column, Index, UniqueConstraint, text
 
 
 class Parcel(SQLModel, table=True):
+    # rows with owner_id NULL are the shared lookup cache, one per (apn, county, state)
+    __table_args__ = (
+        Index(
+            "ix_parcel_cache_key", "apn", "county", "state",
+            unique=True, postgresql_where=text("owner_id IS NULL"),
+        ),
+        # owned rows: one per (owner, apn, county, state); target of bulk_upsert
+        UniqueConstraint("owner_id", "apn", "county", "state", name="uq_parcel_owner_key"),
+        # keyset pagination of an owner's parcels: WHERE owner_id = ? AND id > ? ORDER BY id
+        Index("ix_parcel_owner_id_id", "owner_id", "id"),
+        # utility filters on owned rows: data @> '{"septic_present": true, ...}'
+        Index(
+            "ix_parcel_data", "data",
+            postgresql_using="gin", postgresql_ops={"data": "jsonb_path_ops"},
+            postgresql_where=text("owner_id IS NOT NULL"),
+        ),
+        # bbox / radius search over parcel centroids
+        Index("ix_parcel_centroid", "centroid", postgresql_using="gist"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     apn: str = Field(index=True, nullable=False)
     county: str
@@ -15,6 +36,11 @@ class Parcel(SQLModel, table=True):
     street_address: Optional[str] = None
     city: Optional[str] = None
     data: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB))
+    # parcel centroid from the county parcel layer (EPSG:4326)
+    centroid: Optional[Any] = Field(
+        default=None,
+        sa_column=Column(Geometry("POINT", srid=4326, spatial_index=False)),
+    )
     owner_id: Optional[int] = Field(default=None, foreign_key="users.id", index=True)
 
     created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime
+from typing import Optional, List
+
+from pydantic import BaseModel
+
+from .parcel import ParcelUtilityInfo, ParcelRowError
+
+
+class BulkJobRead(BaseModel):
+    id: uuid.UUID
+    status: str
+    filename: Optional[str] = None
+    total_rows: int
+    rows_done: int
+    rows_failed: int
+    rows_remaining: int
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class BulkJobResultsPage(BaseModel):
+    job_id: uuid.UUID
+    offset: int
+    limit: int
+    total_rows: int
+    next_offset: Optional[int] = None   # None once the last page is reached
+    results: List[ParcelUtilityInfo]
+    errors: List[ParcelRowError] = []
@@ -32,11 +32,38 @@ class ParcelRead(ParcelBase):
     class Config:
         from_attributes = True
 
+class ParcelPage(BaseModel):
+    items: List[ParcelRead]
+    next_cursor: Optional[str] = None  # pass back as ?cursor=; None on the last page
+
+class ParcelLocated(ParcelRead):
+    lon: float
+    lat: float
+    distance_m: Optional[float] = None  # radius search only
+
+class ParcelLocatedPage(BaseModel):
+    items: List[ParcelLocated]
+    next_cursor: Optional[str] = None  # bbox search only
+
+class ParcelUtilityFilter(BaseModel):
+    """Stored-result filters; every field set must match (e.g. septic_present=true&sewer_available=false)."""
+    electric_available: Optional[bool] = None
+    water_available: Optional[bool] = None
+    sewer_available: Optional[bool] = None
+    well_available: Optional[bool] = None
+    septic_present: Optional[bool] = None
+    water_connected: Optional[bool] = None
+    sewer_connected: Optional[bool] = None
+    electric_provider: Optional[str] = None   # exact provider name
+    water_provider: Optional[str] = None
+    sewer_provider: Optional[str] = None
+
 class ParcelLookupRequest(BaseModel):
     apn: str
     street_address: Optional[str] = None
     county: Optional[str] = None
     state: Optional[str] = None
+    refresh: bool = False              # skip the cached result and re-query ArcGIS
 
 class ParcelUtilityInfo(BaseModel):
     apn: str                           
@@ -54,5 +81,11 @@ class ParcelUtilityInfo(BaseModel):
     class Config:
         from_attributes = True  # allows SQLModel → pydantic if needed
 
+class ParcelRowError(BaseModel):
+    row: int                           # 0-based index into the uploaded rows
+    apn: Optional[str] = None
+    detail: str
+
 class ParcelUtilityList(BaseModel):
-    results: List[ParcelUtilityInfo]
\ No newline at end of file
+    results: List[ParcelUtilityInfo]
+    errors: List[ParcelRowError] = []
\ No newline at end of file
@@ -0,0 +1,199 @@
+# app/services/bulk.py
+"""
+Bounded-concurrency bulk enrichment.
+
+Rows are processed in batches; within a batch at most BULK_CONCURRENCY rows
+are in flight and at most BULK_PER_HOST_CONCURRENCY requests hit any single
+upstream host. Output preserves input order and a failing row is reported
+on its RowResult instead of aborting the batch.
+
+enrich_batches yields RowResult lists (one ParcelUtilityInfo per row);
+enrich_frames is the columnar mode for large jobs and yields one classified
+DataFrame per batch instead (see services/columnar.py).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterable, Optional
+
+from ..schemas.parcel import ParcelRowError, ParcelUtilityInfo, ParcelUtilityList
+from .http_client import HostLimiter, use_host_limiter
+from .parcel_lookup import get_raw_utilities, prefetch_batch, utility_info_from_raw
+
+# ---------- Tunables via env ----------
+BULK_CONCURRENCY          = int(os.getenv("BULK_CONCURRENCY", "16"))
+BULK_PER_HOST_CONCURRENCY = int(os.getenv("BULK_PER_HOST_CONCURRENCY", "6"))
+BULK_BATCH_SIZE           = int(os.getenv("BULK_BATCH_SIZE", "200"))
+# group each batch's parcel / wells lookups into IN (...) queries
+BULK_BATCH_QUERIES        = os.getenv("BULK_BATCH_QUERIES", "true").lower() in {"1", "true", "yes"}
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+log = logging.getLogger(__name__)
+
+NOT_FOUND_DETAIL = "Parcel not found or utility data unavailable"
+
+
+@dataclass
+class RowResult:
+    index: int
+    apn: Optional[str]
+    info: Optional[ParcelUtilityInfo] = None
+    error: Optional[str] = None
+    raw: Optional[dict[str, Any]] = None    # unclassified layer values
+
+
+def _clean(v: Any) -> Any:
+    """Spreadsheet blanks arrive as NaN/empty strings; treat them as missing."""
+    if v is None:
+        return None
+    if isinstance(v, float) and v != v:
+        return None
+    if isinstance(v, str) and not v.strip():
+        return None
+    return v
+
+
+def _normalize_row(row: dict[str, Any]) -> dict[str, Any]:
+    apn = _clean(row.get("apn"))
+    return {
+        "apn": str(apn) if apn is not None else None,
+        "street_address": _clean(row.get("street_address")),
+        "county": _clean(row.get("county")),
+        "state": _clean(row.get("state")),
+    }
+
+
+async def _enrich_one(
+    index: int,
+    row: dict[str, Any],
+    prefetched: dict[str, Any],
+    sem: asyncio.Semaphore,
+    limiter: HostLimiter,
+) -> RowResult:
+    apn = row["apn"]
+    async with sem:
+        use_host_limiter(limiter)   # scoped to this task's context
+        try:
+            raw = await get_raw_utilities(
+                apn=apn or "",
+                address=row["street_address"],
+                county=row["county"],
+                state=row["state"],
+                prefetched=prefetched,
+            )
+        except Exception as exc:  # one bad row must not sink the batch
+            return RowResult(index, apn, error=f"{type(exc).__name__}: {exc}")
+    if raw is None:
+        return RowResult(index, apn, error=NOT_FOUND_DETAIL)
+    return RowResult(index, apn, raw=raw)
+
+
+async def enrich_batches(
+    rows: Iterable[dict[str, Any]],
+    *,
+    concurrency: int | None = None,
+    per_host: int | None = None,
+    batch_size: int | None = None,
+) -> AsyncIterator[list[RowResult]]:
+    """
+    Enrich `rows` (dicts with apn / street_address / county / state) and
+    yield one list of RowResult per batch, in input order.
+    """
+    async for batch in _raw_batches(rows, concurrency, per_host, batch_size):
+        for r in batch:
+            if r.raw is not None:
+                r.info = utility_info_from_raw(r.apn or "", r.raw)
+                r.raw = None
+        yield batch
+
+
+async def enrich_frames(
+    rows: Iterable[dict[str, Any]],
+    *,
+    concurrency: int | None = None,
+    per_host: int | None = None,
+    batch_size: int | None = None,
+) -> AsyncIterator["pd.DataFrame"]:
+    """Columnar mode: one classified DataFrame (columnar.classify_frame) per batch."""
+    from .columnar import frame_from_raw
+
+    async for batch in _raw_batches(rows, concurrency, per_host, batch_size):
+        yield frame_from_raw(
+            (r.index, r.apn, *(
+                (r.raw["lon"], r.raw["lat"], r.raw["electric"], r.raw["water"],
+                 r.raw["sewer"], r.raw["has_wells_row"], r.raw["dw"], r.raw["ww"])
+                if r.raw is not None else (None, None, None, None, None, False, None, None)
+            ), r.error)
+            for r in batch
+        )
+
+
+async def _raw_batches(
+    rows: Iterable[dict[str, Any]],
+    concurrency: int | None,
+    per_host: int | None,
+    batch_size: int | None,
+) -> AsyncIterator[list[RowResult]]:
+    sem = asyncio.Semaphore(max(1, concurrency or BULK_CONCURRENCY))
+    limiter = HostLimiter(per_host or BULK_PER_HOST_CONCURRENCY)
+    size = max(1, batch_size or BULK_BATCH_SIZE)
+
+    batch: list[tuple[int, dict[str, Any]]] = []
+    for index, row in enumerate(rows):
+        batch.append((index, row))
+        if len(batch) >= size:
+            yield await _run_batch(batch, sem, limiter)
+            batch = []
+    if batch:
+        yield await _run_batch(batch, sem, limiter)
+
+
+async def _prefetch(rows: list[dict[str, Any]], limiter: HostLimiter) -> list[dict[str, Any]]:
+    use_host_limiter(limiter)   # own task, so the limiter doesn't leak to the caller
+    return await prefetch_batch(rows)
+
+
+async def _run_batch(
+    batch: list[tuple[int, dict[str, Any]]],
+    sem: asyncio.Semaphore,
+    limiter: HostLimiter,
+) -> list[RowResult]:
+    rows = [_normalize_row(row) for _, row in batch]
+
+    prefetched: list[dict[str, Any]] = [{} for _ in rows]
+    if BULK_BATCH_QUERIES:
+        try:
+            prefetched = await asyncio.create_task(_prefetch(rows, limiter))
+        except Exception as exc:
+            # rows fall back to their own single-parcel queries
+            log.warning("batched prefetch failed: %s", exc)
+
+    # gather() keeps result order aligned with `batch`
+    return list(await asyncio.gather(*(
+        _enrich_one(i, row, pre, sem, limiter)
+        for (i, _), row, pre in zip(batch, rows, prefetched)
+    )))
+
+
+async def enrich_all(rows: Iterable[dict[str, Any]], **kwargs: Any) -> list[RowResult]:
+    """Collect every batch from enrich_batches() into one ordered list."""
+    out: list[RowResult] = []
+    async for batch in enrich_batches(rows, **kwargs):
+        out.extend(batch)
+    return out
+
+
+def to_utility_list(rows: Iterable[RowResult]) -> ParcelUtilityList:
+    results: list[ParcelUtilityInfo] = []
+    errors: list[ParcelRowError] = []
+    for r in rows:
+        if r.info is not None:
+            results.append(r.info)
+        else:
+            errors.append(ParcelRowError(row=r.index, apn=r.apn, detail=r.error or NOT_FOUND_DETAIL))
+    return ParcelUtilityList(results=results, errors=errors)
@@ -0,0 +1,127 @@
+# app/services/bulk_jobs.py
+"""
+Durable bulk-upload jobs.
+
+The API stores the parsed input rows in bulk_job_rows and enqueues
+`worker.parcels.run_bulk_job`; the worker pulls pending rows in batches,
+runs them through the bulk engine (columnar mode, see services/columnar.py)
+and writes each row's result back. Successful rows are also upserted into
+the owner's parcels (crud_parcel.bulk_upsert), one set-based statement
+per page.
+Progress therefore survives worker restarts (unfinished rows are simply
+picked up again) and results never pass through the Celery result backend.
+A task redelivered while the first run is still going (acks_late past the
+broker's visibility timeout) works alongside it: pages are claimed with
+FOR UPDATE SKIP LOCKED and only rows still pending are counted.
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Iterator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..crud.crud_bulk_job import crud_bulk_job
+from ..crud.crud_parcel import crud_parcel
+from ..models.bulk_job import BulkJob
+from ..schemas.bulk_job import BulkJobRead
+from .bulk import BULK_BATCH_SIZE, enrich_frames
+
+RUN_BULK_JOB_TASK = "worker.parcels.run_bulk_job"
+
+
+def job_status(job: BulkJob) -> BulkJobRead:
+    """Snapshot of a job including rows remaining and a naive linear ETA."""
+    processed = job.rows_done + job.rows_failed
+    remaining = max(job.total_rows - processed, 0)
+
+    eta: float | None = None
+    if job.status == "completed":
+        eta = 0.0
+    elif job.started_at and processed:
+        elapsed = (datetime.utcnow() - job.started_at).total_seconds()
+        eta = round(elapsed / processed * remaining, 1)
+
+    return BulkJobRead(
+        id=job.id,
+        status=job.status,
+        filename=job.filename,
+        total_rows=job.total_rows,
+        rows_done=job.rows_done,
+        rows_failed=job.rows_failed,
+        rows_remaining=remaining,
+        eta_seconds=eta,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+def _owned_parcels(pending: list, results: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    for row, res in zip(pending, results):
+        if res["result"] is not None and row.apn and row.county and row.state:
+            yield {
+                "apn": row.apn,
+                "county": row.county,
+                "state": row.state,
+                "street_address": row.street_address,
+                "data": res["result"],
+                "point": res["point"],
+            }
+
+
+async def run_job(
+    session_factory: Callable[[], AsyncSession],
+    job_id: uuid.UUID,
+    **bulk_opts: Any,
+) -> None:
+    """Process every pending row of `job_id`; safe to re-run after a crash."""
+    from .columnar import iter_outcomes, iter_points    # pandas; keep job_status light
+
+    batch_size = bulk_opts.get("batch_size") or BULK_BATCH_SIZE
+
+    async with session_factory() as db:
+        job = await crud_bulk_job.get(db, job_id)
+        if job is None or job.status == "completed":
+            return
+        job = await crud_bulk_job.set_status(db, job=job, status="running")
+
+        try:
+            while True:
+                pending = await crud_bulk_job.get_pending_rows(db, job_id=job_id, limit=batch_size)
+                if not pending:
+                    if await crud_bulk_job.count_pending(db, job_id=job_id):
+                        # the rest is claimed by another run of this job, which completes it
+                        await db.commit()
+                        return
+                    break
+                inputs = [
+                    {"apn": r.apn, "street_address": r.street_address,
+                     "county": r.county, "state": r.state}
+                    for r in pending
+                ]
+                results: list[dict[str, Any]] = []
+                opts = {**bulk_opts, "batch_size": len(inputs)}   # one frame per page
+                async for frame in enrich_frames(inputs, **opts):
+                    results.extend(
+                        {"id": pending[i].id, "result": record, "error": error, "point": point}
+                        for (i, record, error), point in zip(iter_outcomes(frame), iter_points(frame))
+                    )
+                if job.owner_id is not None:
+                    # idempotent, so a crash before record_results just re-upserts
+                    await crud_parcel.bulk_upsert(
+                        db,
+                        owner_id=job.owner_id,
+                        rows=_owned_parcels(pending, results),
+                    )
+                await crud_bulk_job.record_results(db, job=job, results=results)
+        except Exception as exc:
+            await db.rollback()
+            await crud_bulk_job.set_status(
+                db, job=job, status="failed", error=f"{type(exc).__name__}: {exc}"
+            )
+            raise
+
+        await crud_bulk_job.set_status(db, job=job, status="completed")
@@ -0,0 +1,104 @@
+# app/services/columnar.py
+"""
+Columnar results for bulk enrichment.
+
+Bulk batches keep the raw layer values (providers, FLWMI DW/WW strings)
+as DataFrame columns and classify them with vectorised string ops — the
+same rules as parcel_lookup._classify_water_sewer / _parse_bool, applied
+to whole columns — so a large job never materialises one pydantic model
+per row. Rows only become dicts at serialisation time.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator
+
+import pandas as pd
+
+from .parcel_lookup import _TRUTHY
+
+# ParcelUtilityInfo field order
+UTILITY_COLUMNS = [
+    "apn",
+    "electric_available", "electric_provider",
+    "water_available", "water_provider",
+    "sewer_available", "sewer_provider",
+    "well_available", "septic_present", "water_connected", "sewer_connected",
+]
+RAW_COLUMNS = [
+    "row", "apn", "lon", "lat",
+    "electric", "water", "sewer", "has_wells_row", "dw", "ww", "error",
+]
+
+
+def frame_from_raw(records: Iterable[tuple]) -> pd.DataFrame:
+    """`records` are tuples in RAW_COLUMNS order; returns the classified frame."""
+    df = pd.DataFrame.from_records(list(records), columns=RAW_COLUMNS)
+    return classify_frame(df)
+
+
+def _norm(col: pd.Series) -> pd.Series:
+    return col.where(col.notna(), "").astype(str).str.strip().str.lower()
+
+
+def classify_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the boolean utility columns to a frame of raw layer values."""
+    out = pd.DataFrame({
+        "row": df["row"], "apn": df["apn"], "error": df["error"],
+        "lon": df["lon"], "lat": df["lat"],
+    })
+
+    for kind in ("electric", "water", "sewer"):
+        provider = df[kind].where(df[kind].notna(), None)
+        out[f"{kind}_provider"] = provider
+        out[f"{kind}_available"] = provider.fillna("").astype(bool)
+
+    has_row = df["has_wells_row"].fillna(False).astype(bool)
+    dw = _norm(df["dw"])
+    ww = _norm(df["ww"])
+
+    # ---- WELL / CITY WATER ----
+    dw_public = dw.str.contains("public", regex=False)
+    dw_well = ~dw_public & dw.str.contains("well", regex=False)
+
+    # ---- CITY SEWER / SEPTIC ----
+    has_sewer = ww.str.contains("sewer", regex=False)
+    has_septic = ww.str.contains("septic", regex=False)
+    sewer_true = (has_sewer & ~has_septic) | (~has_sewer & ~has_septic & (ww == "public"))
+    sewer_known = sewer_true | has_septic
+    septic_token = ww.str.replace(" ", "", regex=False).isin(_TRUTHY)
+
+    out["well_available"] = has_row & dw_well
+    out["water_connected"] = has_row & dw_public
+    out["sewer_connected"] = has_row & sewer_true
+    out["septic_present"] = has_row & (has_septic | (~sewer_known & septic_token))
+    return out
+
+
+def iter_records(df: pd.DataFrame) -> Iterator[dict[str, Any]]:
+    """ParcelUtilityInfo-shaped dicts for the successful rows of `df`."""
+    ok = df.loc[df["error"].isna(), UTILITY_COLUMNS].astype(object)   # plain Python scalars
+    ok = ok.where(ok.notna(), None)
+    for rec in ok.itertuples(index=False, name=None):
+        yield dict(zip(UTILITY_COLUMNS, rec))
+
+
+def iter_errors(df: pd.DataFrame) -> Iterator[dict[str, Any]]:
+    bad = df[df["error"].notna()]
+    for row, apn, error in bad[["row", "apn", "error"]].itertuples(index=False, name=None):
+        yield {"row": int(row), "apn": apn, "detail": error}
+
+
+def iter_outcomes(df: pd.DataFrame) -> Iterator[tuple[int, dict[str, Any] | None, str | None]]:
+    """(row, record, error) for every row of `df`, in frame order."""
+    records = iter_records(df)
+    for row, error in df[["row", "error"]].itertuples(index=False, name=None):
+        if pd.isna(error):
+            yield int(row), next(records), None
+        else:
+            yield int(row), None, error
+
+
+def iter_points(df: pd.DataFrame) -> Iterator[tuple[float, float] | None]:
+    """Parcel centroid (lon, lat) per row of `df`, None where unknown."""
+    for lon, lat in df[["lon", "lat"]].itertuples(index=False, name=None):
+        yield None if pd.isna(lon) or pd.isna(lat) else (float(lon), float(lat))
@@ -1,53 +1,178 @@
 import io
-from typing import List
+import os
+from itertools import chain
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterable, Iterator, List
 
 import pandas as pd
 
-from ..schemas.parcel import ParcelUtilityInfo
-from .parcel_lookup import get_utilities_for_parcel
+from .bulk import RowResult, enrich_all, enrich_batches
 
+# rows per pandas chunk when streaming CSV uploads
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", "5000"))
 
-async def parse_in_memory(buffer: bytes, filename: str) -> List[ParcelUtilityInfo]:
+REQUIRED_COLS = ["apn", "street_address", "county", "state"]
+
+
+def _normalize_columns(columns: Iterable[Any]) -> List[str]:
+    """Strip spaces, lower-case, replace spaces with underscores, then apply aliases."""
+    cols = (
+        pd.Index([str(c) if c is not None else "" for c in columns])
+        .str.strip().str.lower().str.replace(r"\s+", "_", regex=True)
+        .tolist()
+    )
+    # Accept common variants
+    if "address" in cols and "street_address" not in cols:
+        cols[cols.index("address")] = "street_address"
+    if "pan" in cols and "apn" not in cols:
+        cols[cols.index("pan")] = "apn"
+
+    missing = set(REQUIRED_COLS) - set(cols)
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
+    return cols
+
+
+def _iter_csv(fileobj: BinaryIO, chunksize: int) -> Iterator[Dict[str, Any]]:
+    # dtype=str keeps APNs verbatim (leading zeros) and consistent across chunks
+    reader = pd.read_csv(fileobj, chunksize=chunksize, dtype=str)
+    for chunk in reader:
+        chunk.columns = _normalize_columns(chunk.columns)
+        yield from chunk[REQUIRED_COLS].to_dict("records")
+
+
+def _iter_xlsx(fileobj: BinaryIO) -> Iterator[Dict[str, Any]]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("Uploaded file is empty")
+        cols = _normalize_columns(header)
+        positions = [cols.index(c) for c in REQUIRED_COLS]
+        for values in rows:
+            if values is None or all(v is None for v in values):
+                continue
+            yield {c: values[p] if p < len(values) else None for c, p in zip(REQUIRED_COLS, positions)}
+    finally:
+        wb.close()
+
+
+def _iter_xls(fileobj: BinaryIO) -> Iterator[Dict[str, Any]]:
+    # legacy .xls has no row-streaming reader; these files are small by format limits
+    df = pd.read_excel(fileobj)
+    df.columns = _normalize_columns(df.columns)
+    yield from df[REQUIRED_COLS].to_dict("records")
+
+
+def iter_rows(fileobj: BinaryIO, filename: str, chunksize: int | None = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream normalized apn/street_address/county/state rows out of an uploaded
+    CSV/Excel file without materialising the whole sheet. Header problems
+    raise ValueError before the first row is yielded.
+    """
     ext = filename.lower().split(".")[-1]
     if ext == "csv":
-        df = pd.read_csv(io.BytesIO(buffer))
-    elif ext in {"xls", "xlsx"}:
-        df = pd.read_excel(io.BytesIO(buffer))
+        rows = _iter_csv(fileobj, chunksize or CSV_CHUNK_ROWS)
+    elif ext == "xlsx":
+        rows = _iter_xlsx(fileobj)
+    elif ext == "xls":
+        rows = _iter_xls(fileobj)
     else:
         raise ValueError("Unsupported file type")
 
-    # Normalize column names (strip spaces, lower-case, replace spaces with underscores)
-    df.columns = (
-        df.columns.str.strip().str.lower().str.replace(r"\s+", "_", regex=True)
-    )
+    # pull the first row now so column validation happens eagerly
+    first = next(rows, None)
+    if first is None:
+        return iter(())
+    return chain([first], rows)
 
-    # Accept common variants
-    rename_map = {}
-    if "address" in df.columns and "street_address" not in df.columns:
-        rename_map["address"] = "street_address"
-    if "pan" in df.columns and "apn" not in df.columns:
-        rename_map["pan"] = "apn"
-    df = df.rename(columns=rename_map)
 
-    required_cols = ["apn", "street_address", "county", "state"]
-    missing = set(required_cols) - set(df.columns)
+# ---------- whole-row frames (enriched-file export) ----------
+def _csv_frames(fileobj: BinaryIO, chunksize: int) -> Iterator[pd.DataFrame]:
+    yield from pd.read_csv(fileobj, chunksize=chunksize, dtype=str)
+
+
+def _xlsx_frames(fileobj: BinaryIO, chunksize: int) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("Uploaded file is empty")
+        header = ["" if c is None else str(c) for c in header]
+        width = len(header)
+        chunk: List[tuple] = []
+        for values in rows:
+            if values is None or all(v is None for v in values):
+                continue
+            chunk.append(tuple(values[:width]) + (None,) * (width - len(values)))
+            if len(chunk) >= chunksize:
+                yield pd.DataFrame.from_records(chunk, columns=header)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame.from_records(chunk, columns=header)
+    finally:
+        wb.close()
+
+
+def _xls_frames(fileobj: BinaryIO, chunksize: int) -> Iterator[pd.DataFrame]:
+    df = pd.read_excel(fileobj)
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def iter_frames(fileobj: BinaryIO, filename: str, chunksize: int | None = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream the upload as DataFrame chunks with every original column and
+    header kept as-is. The first chunk's header is validated eagerly, like
+    iter_rows; use input_rows() to get the lookup fields of a chunk.
+    """
+    ext = filename.lower().split(".")[-1]
+    size = chunksize or CSV_CHUNK_ROWS
+    if ext == "csv":
+        frames = _csv_frames(fileobj, size)
+    elif ext == "xlsx":
+        frames = _xlsx_frames(fileobj, size)
+    elif ext == "xls":
+        frames = _xls_frames(fileobj, size)
+    else:
+        raise ValueError("Unsupported file type")
+
+    first = next(frames, None)
+    if first is None:
+        return iter(())
+    _normalize_columns(first.columns)
+    return chain([first], frames)
+
+
+def input_rows(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """apn/street_address/county/state dicts for one iter_frames() chunk."""
+    cols = _normalize_columns(frame.columns)
+    positions = [cols.index(c) for c in REQUIRED_COLS]
+    sub = frame.iloc[:, positions].astype(object)
+    sub = sub.where(sub.notna(), None)
+    return [dict(zip(REQUIRED_COLS, values)) for values in sub.itertuples(index=False, name=None)]
+
+
+def read_rows(buffer: bytes, filename: str) -> List[Dict[str, Any]]:
+    """Parse an uploaded CSV/Excel file into normalized apn/street_address/county/state rows."""
+    return list(iter_rows(io.BytesIO(buffer), filename))
 
-    if missing:
-        raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
 
-    df = df[required_cols]
+async def parse_stream(fileobj: BinaryIO, filename: str, **bulk_opts) -> AsyncIterator[List[RowResult]]:
+    """Yield enriched batches while the file is still being read."""
+    async for batch in enrich_batches(iter_rows(fileobj, filename), **bulk_opts):
+        yield batch
 
-    results: list[ParcelUtilityInfo] = []
-    for _, row in df.iterrows():
-        info = await get_utilities_for_parcel(
-            apn=str(row["apn"]),
-            address=row.get("street_address"),
-            county=row.get("county"),
-            state=row.get("state"),
-        )
-        if info:
-            results.append(info)
 
-    return results
+async def parse_in_memory(buffer: bytes, filename: str, **bulk_opts) -> List[RowResult]:
+    # rows run through the bulk engine (bounded concurrency, ordered output,
+    # per-row errors); bulk_opts = concurrency / per_host / batch_size
+    return await enrich_all(iter_rows(io.BytesIO(buffer), filename), **bulk_opts)
 
-# Note: Later you can wrap parse_in_memory with a Celery task so the HTTP request returns immediately with a task-id; for now it runs inline.
\ No newline at end of file
+# Large files should go through the /parcels/jobs API (services/bulk_jobs.py),
+# which runs the same engine in the Celery worker and persists results.
@@ -0,0 +1,229 @@
+# app/services/enriched_export.py
+"""
+Enriched-file download: the uploaded sheet with the utility columns
+appended, in CSV, XLSX or Parquet.
+
+The upload is read in chunks (csv_processor.iter_frames), each chunk is
+enriched as one columnar batch and written straight to the response, so
+memory stays at one chunk and the first bytes go out after the first
+batch. All three writers emit bytes incrementally:
+
+* CSV     – one to_csv() block per chunk
+* XLSX    – a write-only SpreadsheetML writer streaming sheet1.xml into a
+            zip archive on an unseekable sink (zip data descriptors)
+* Parquet – one pyarrow row group per chunk
+"""
+from __future__ import annotations
+
+import io
+import numbers
+import re
+import zipfile
+from datetime import date, datetime, time
+from typing import Any, AsyncIterator, BinaryIO, Iterator
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+from .bulk import BULK_BATCH_SIZE, enrich_frames
+from .columnar import UTILITY_COLUMNS
+from .csv_processor import input_rows, iter_frames
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# appended after the uploaded columns; apn is already in the sheet
+ENRICHED_COLUMNS = [c for c in UTILITY_COLUMNS if c != "apn"] + ["utility_error"]
+_BOOL_COLUMNS = [c for c in ENRICHED_COLUMNS if c.endswith(("_available", "_present", "_connected"))]
+
+
+class _Sink(io.RawIOBase):
+    """Unseekable byte sink drained after every chunk."""
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._buf += b
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:       # pyarrow needs offsets; zipfile still sees no seek()
+        return self._pos
+
+    def take(self) -> bytes:
+        out = bytes(self._buf)
+        self._buf.clear()
+        return out
+
+
+def default_format(filename: str) -> str:
+    """Same format as the upload; legacy .xls comes back as .xlsx."""
+    return "csv" if filename.lower().endswith(".csv") else "xlsx"
+
+
+def export_filename(filename: str, fmt: str) -> str:
+    stem = filename.replace("\\", "/").rsplit("/", 1)[-1].rsplit(".", 1)[0].replace('"', "")
+    return f"{stem or 'parcels'}_enriched.{fmt}"
+
+
+async def _enriched_chunks(frames: Iterator[pd.DataFrame], **bulk_opts: Any) -> AsyncIterator[pd.DataFrame]:
+    for chunk in frames:
+        chunk = chunk.reset_index(drop=True)
+        # re-uploading an enriched file replaces its utility columns
+        chunk = chunk.drop(columns=[c for c in ENRICHED_COLUMNS if c in chunk.columns])
+        inputs = input_rows(chunk)
+        opts = {**bulk_opts, "batch_size": len(inputs)}   # one frame per chunk
+        async for result in enrich_frames(inputs, **opts):
+            result = result.reset_index(drop=True)
+            failed = result["error"].notna()
+            enriched = result[ENRICHED_COLUMNS[:-1]].astype(object)
+            enriched.loc[failed, _BOOL_COLUMNS] = None     # unknown, not False
+            enriched = enriched.where(enriched.notna(), None)
+            enriched["utility_error"] = result["error"].where(failed, None)
+            yield pd.concat([chunk, enriched], axis=1)
+
+
+# ---------- CSV ----------
+async def _write_csv(chunks: AsyncIterator[pd.DataFrame]) -> AsyncIterator[bytes]:
+    header = True
+    async for df in chunks:
+        yield df.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+
+
+# ---------- XLSX ----------
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Parcels" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+# control characters XML 1.0 cannot carry (same set openpyxl rejects)
+_ILLEGAL_XML = re.compile(r"[\000-\010\013\014\016-\037]")
+
+
+def _xlsx_cell(v: Any) -> str:
+    if v is None or (not isinstance(v, str) and pd.isna(v)):
+        return "<c/>"
+    if isinstance(v, (bool, np.bool_)):
+        return f'<c t="b"><v>{int(v)}</v></c>'
+    if isinstance(v, numbers.Real):
+        return f"<c><v>{v}</v></c>"
+    if isinstance(v, (datetime, date, time)):
+        v = v.isoformat()
+    text = escape(_ILLEGAL_XML.sub("", str(v)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_rows(df: pd.DataFrame, header: bool) -> str:
+    lines = []
+    if header:
+        lines.append("<row>" + "".join(_xlsx_cell(str(c)) for c in df.columns) + "</row>")
+    for values in df.itertuples(index=False, name=None):
+        lines.append("<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>")
+    return "".join(lines)
+
+
+async def _write_xlsx(chunks: AsyncIterator[pd.DataFrame]) -> AsyncIterator[bytes]:
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, xml in _XLSX_STATIC.items():
+            zf.writestr(name, xml)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(_SHEET_HEAD.encode())
+            header = True
+            async for df in chunks:
+                sheet.write(_xlsx_rows(df, header).encode("utf-8"))
+                header = False
+                yield sink.take()
+            sheet.write(_SHEET_TAIL.encode())
+    yield sink.take()
+
+
+# ---------- Parquet ----------
+async def _write_parquet(chunks: AsyncIterator[pd.DataFrame]) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _Sink()
+    writer = None
+    try:
+        async for df in chunks:
+            if writer is None:
+                # uploaded columns as text so every row group shares one schema
+                fields = [pa.field(str(c), pa.string()) for c in df.columns[: -len(ENRICHED_COLUMNS)]]
+                fields += [
+                    pa.field(c, pa.bool_() if c in _BOOL_COLUMNS else pa.string())
+                    for c in ENRICHED_COLUMNS
+                ]
+                schema = pa.schema(fields)
+                writer = pq.ParquetWriter(sink, schema)
+            original = df.iloc[:, : -len(ENRICHED_COLUMNS)]
+            original = original.astype(str).where(original.notna(), None)
+            df = pd.concat([original, df[ENRICHED_COLUMNS]], axis=1)
+            df.columns = schema.names
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            yield sink.take()
+    finally:
+        if writer is not None:
+            writer.close()
+    yield sink.take()
+
+
+_WRITERS = {"csv": _write_csv, "xlsx": _write_xlsx, "parquet": _write_parquet}
+
+
+def stream_enriched(fileobj: BinaryIO, filename: str, fmt: str, **bulk_opts: Any) -> AsyncIterator[bytes]:
+    """
+    Byte stream of the enriched file. Header problems raise ValueError here,
+    before the response starts; rows that fail keep their original values
+    and carry the reason in `utility_error`.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    frames = iter_frames(fileobj, filename, bulk_opts.pop("batch_size", None) or BULK_BATCH_SIZE)
+    return _WRITERS[fmt](_enriched_chunks(frames, **bulk_opts))
@@ -0,0 +1,211 @@
+# app/services/host_guard.py
+"""
+Per-host adaptive concurrency, circuit breaker and retry budget for
+upstream GIS servers.
+
+- Concurrency follows AIMD: each fast success adds ~1 slot per "round"
+  (+1/limit), a failure or a response slower than the latency target
+  halves the limit (at most once per cool-off interval).
+- The breaker opens when the error rate over a rolling window crosses a
+  threshold; while open, calls fail fast with UpstreamUnavailable. After
+  the cooldown a single probe is let through (half-open) to decide.
+- Retries draw from a token bucket that every request tops up by a small
+  ratio, so retries stay a bounded fraction of traffic under failure.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import time
+from collections import deque
+from typing import AsyncIterator
+
+import httpx
+
+# ---------- Tunables via env ----------
+HOST_MIN_CONCURRENCY     = int(os.getenv("ESRI_HOST_MIN_CONCURRENCY", "1"))
+HOST_MAX_CONCURRENCY     = int(os.getenv("ESRI_HOST_MAX_CONCURRENCY", "32"))
+HOST_INITIAL_CONCURRENCY = int(os.getenv("ESRI_HOST_INITIAL_CONCURRENCY", "8"))
+HOST_LATENCY_TARGET      = float(os.getenv("ESRI_HOST_LATENCY_TARGET", "3.0"))   # seconds
+HOST_DECREASE_INTERVAL   = float(os.getenv("ESRI_HOST_DECREASE_INTERVAL", "1.0"))
+BREAKER_WINDOW           = float(os.getenv("ESRI_BREAKER_WINDOW", "30"))
+BREAKER_MIN_REQUESTS     = int(os.getenv("ESRI_BREAKER_MIN_REQUESTS", "10"))
+BREAKER_ERROR_RATE       = float(os.getenv("ESRI_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_COOLDOWN         = float(os.getenv("ESRI_BREAKER_COOLDOWN", "30"))
+RETRY_BUDGET_RATIO       = float(os.getenv("ESRI_RETRY_BUDGET_RATIO", "0.1"))
+RETRY_BUDGET_MAX         = float(os.getenv("ESRI_RETRY_BUDGET_MAX", "10"))
+
+
+class UpstreamUnavailable(Exception):
+    """Raised without calling upstream while a host's circuit is open."""
+
+
+def is_overload(exc: BaseException) -> bool:
+    """Errors that signal a struggling server (vs. a bad request)."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return code == 429 or code >= 500
+    return isinstance(exc, (httpx.TimeoutException, httpx.TransportError))
+
+
+class HostGuard:
+    def __init__(self, host: str):
+        self.host = host
+        self.limit = float(HOST_INITIAL_CONCURRENCY)
+        self.inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._open_until = 0.0
+        self._probing = False
+        self._retry_tokens = RETRY_BUDGET_MAX
+
+    # ---------- circuit breaker ----------
+    @property
+    def state(self) -> str:
+        if self._open_until == 0.0:
+            return "closed"
+        return "open" if time.monotonic() < self._open_until else "half-open"
+
+    def _admit(self) -> bool:
+        """Returns True if this call is the half-open probe."""
+        state = self.state
+        if state == "open" or (state == "half-open" and self._probing):
+            raise UpstreamUnavailable(f"{self.host}: circuit open")
+        if state == "half-open":
+            self._probing = True
+            return True
+        return False
+
+    def _record(self, ok: bool, probe: bool) -> None:
+        now = time.monotonic()
+        if probe:
+            self._probing = False
+            if ok:
+                self._open_until = 0.0
+                self._outcomes.clear()
+            else:
+                self._open_until = now + BREAKER_COOLDOWN
+            return
+
+        self._outcomes.append((now, ok))
+        while self._outcomes and self._outcomes[0][0] < now - BREAKER_WINDOW:
+            self._outcomes.popleft()
+        total = len(self._outcomes)
+        if total >= BREAKER_MIN_REQUESTS:
+            errors = sum(1 for _, good in self._outcomes if not good)
+            if errors / total >= BREAKER_ERROR_RATE:
+                self._open_until = now + BREAKER_COOLDOWN
+
+    # ---------- AIMD ----------
+    def _increase(self) -> None:
+        self.limit = min(float(HOST_MAX_CONCURRENCY), self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease >= HOST_DECREASE_INTERVAL:
+            self.limit = max(float(HOST_MIN_CONCURRENCY), self.limit / 2)
+            self._last_decrease = now
+
+    async def _acquire(self) -> None:
+        while self.inflight >= int(self.limit):
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            except BaseException:
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(fut)
+                # woken, then cancelled before taking the slot: hand the wakeup on
+                if fut.done() and not fut.cancelled():
+                    self._wake()
+                raise
+            with contextlib.suppress(ValueError):
+                self._waiters.remove(fut)
+        self.inflight += 1
+
+    def _release(self) -> None:
+        self.inflight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.inflight
+        for fut in list(self._waiters):
+            if free <= 0:
+                break
+            if not fut.done():
+                try:
+                    fut.set_result(None)
+                except RuntimeError:   # future from a closed loop (e.g. old Celery task)
+                    continue
+                free -= 1
+
+    # ---------- retry budget ----------
+    def _deposit(self) -> None:
+        self._retry_tokens = min(RETRY_BUDGET_MAX, self._retry_tokens + RETRY_BUDGET_RATIO)
+
+    def try_retry(self) -> bool:
+        """Spend one retry token; False means retrying now would add load."""
+        if self.state != "closed" or self._retry_tokens < 1.0:
+            return False
+        self._retry_tokens -= 1.0
+        return True
+
+    # ---------- public ----------
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wrap one upstream request; the body should raise on failure."""
+        probe = self._admit()
+        self._deposit()
+        try:
+            await self._acquire()
+        except BaseException:
+            # cancelled while queued: let the next call be the probe
+            if probe:
+                self._probing = False
+            raise
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException as exc:
+            self._release()
+            overloaded = is_overload(exc)
+            if overloaded:
+                self._decrease()
+            if not isinstance(exc, asyncio.CancelledError):
+                self._record(not overloaded, probe)
+            elif probe:
+                self._probing = False
+            raise
+        else:
+            self._release()
+            if time.monotonic() - start > HOST_LATENCY_TARGET:
+                self._decrease()
+            else:
+                self._increase()
+            self._record(True, probe)
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "inflight": self.inflight,
+            "state": self.state,
+            "retry_tokens": round(self._retry_tokens, 2),
+        }
+
+
+_guards: dict[str, HostGuard] = {}
+
+
+def guard_for(url: str) -> HostGuard:
+    host = httpx.URL(url).host
+    guard = _guards.get(host)
+    if guard is None:
+        guard = _guards[host] = HostGuard(host)
+    return guard
+
+
+def snapshot() -> dict[str, dict]:
+    return {host: g.snapshot() for host, g in _guards.items()}
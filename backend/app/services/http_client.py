@@ -1,18 +1,31 @@
 # app/services/http_client.py
 from __future__ import annotations
 import os
-import socket
+import asyncio
+import logging
 import contextlib
+import ssl
+from contextvars import ContextVar
 import httpx
+import httpcore
 import certifi
 
+from ..config.loader import catalogue_store
+from ..config.models import PoolCfg
+from .resolver import CachingResolverBackend
+from .response_cache import init_response_cache, close_response_cache
+from . import singleflight
+
+log = logging.getLogger(__name__)
+
 # ---------- Tunables via env ----------
 ESRI_CONNECT_TIMEOUT = float(os.getenv("ESRI_CONNECT_TIMEOUT", "10"))
 ESRI_READ_TIMEOUT    = float(os.getenv("ESRI_READ_TIMEOUT", "30"))
 ESRI_WRITE_TIMEOUT   = float(os.getenv("ESRI_WRITE_TIMEOUT", "10"))
 ESRI_POOL_TIMEOUT    = float(os.getenv("ESRI_POOL_TIMEOUT", "60"))
-ESRI_RETRIES         = int(os.getenv("ESRI_RETRIES", "3"))
+ESRI_RETRIES         = int(os.getenv("ESRI_RETRIES", "1"))   # connect-level only; app retries are budgeted (host_guard)
 ESRI_FORCE_IPV4_DNS  = os.getenv("ESRI_FORCE_IPV4_DNS", "false").lower() in {"1","true","yes"}
+ESRI_DNS_TTL         = float(os.getenv("ESRI_DNS_TTL", "300"))
 ESRI_TRUST_ENV       = os.getenv("ESRI_TRUST_ENV", "false").lower() in {"1","true","yes"}  # default off (avoid proxy/IPv6 surprises)
 
 # ---------- curl-like headers ----------
@@ -22,30 +35,103 @@ DEFAULT_HEADERS = {
     # You can leave keep-alive (default). If you ever see odd stalls, flip this via env and add 'Connection': 'close'
 }
 
-# ---------- Force IPv4 DNS (like curl -4) ----------
+# ---------- DNS: cached, IPv4-first, scoped to the ESRI clients ----------
+_resolver = CachingResolverBackend(ttl=ESRI_DNS_TTL, ipv4_only=ESRI_FORCE_IPV4_DNS)
+
+class _PoolTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport over an httpcore pool we build ourselves, so the pool
+    can take our network backend (httpx.AsyncHTTPTransport has no public
+    way to pass one). Request / response / error mapping mirrors httpx's.
+    """
+
+    def __init__(self, pool: httpcore.AsyncConnectionPool):
+        self._pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _httpx_errors(request):
+            resp = await self._pool.handle_async_request(core_request)
+        return httpx.Response(
+            status_code=resp.status,
+            headers=resp.headers,
+            stream=_ResponseStream(resp.stream, request),
+            extensions=resp.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream, request: httpx.Request):
+        self._stream = stream
+        self._request = request
+
+    async def __aiter__(self):
+        with _httpx_errors(self._request):
+            async for part in self._stream:
+                yield part
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
 @contextlib.contextmanager
-def force_ipv4_dns(enabled: bool):
-    """Temporarily filter DNS results to AF_INET only."""
-    if not enabled:
-        yield
-        return
-    orig = socket.getaddrinfo
-    def v4_only(host, port, family=0, type=0, proto=0, flags=0):
-        results = orig(host, port, family, type, proto, flags)
-        v4 = [r for r in results if r[0] == socket.AF_INET]
-        return v4 or results
+def _httpx_errors(request: httpx.Request):
+    """Re-raise httpcore errors as the httpx exception of the same name (most specific first)."""
     try:
-        socket.getaddrinfo = v4_only  # type: ignore[assignment]
         yield
-    finally:
-        socket.getaddrinfo = orig  # type: ignore[assignment]
+    except Exception as exc:
+        for cls in type(exc).__mro__:
+            mapped = getattr(httpx, cls.__name__, None) if cls.__module__.startswith("httpcore") else None
+            if isinstance(mapped, type) and issubclass(mapped, httpx.TransportError):
+                raise mapped(str(exc), request=request) from exc
+        raise
+
+def _esri_transport(pool: PoolCfg) -> httpx.AsyncBaseTransport:
+    return _PoolTransport(httpcore.AsyncConnectionPool(
+        ssl_context=ssl.create_default_context(cafile=certifi.where()),   # stable CA bundle
+        max_connections=pool.max_connections,
+        max_keepalive_connections=pool.max_keepalive_connections,
+        keepalive_expiry=pool.keepalive_expiry,
+        http1=True,
+        http2=pool.http2 and _http2_available(),
+        retries=ESRI_RETRIES,
+        network_backend=_resolver,
+    ))
+
+# ---------- AsyncClients: one per catalogue host + a default ----------
+ESRI_PREWARM         = os.getenv("ESRI_PREWARM", "true").lower() in {"1","true","yes"}
+ESRI_PREWARM_TIMEOUT = float(os.getenv("ESRI_PREWARM_TIMEOUT", "5"))
 
-# ---------- Singleton AsyncClient ----------
-_esri_client: httpx.AsyncClient | None = None
+_esri_client: httpx.AsyncClient | None = None          # hosts without a pool config
+_host_clients: dict[str, httpx.AsyncClient] = {}
 
-def build_esri_client() -> httpx.AsyncClient:
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def build_esri_client(
+    pool: PoolCfg | None = None, transport: httpx.AsyncBaseTransport | None = None
+) -> httpx.AsyncClient:
+    """`transport` replaces the pooled network transport (e.g. a replay transport in tests)."""
+    pool = pool or PoolCfg()
     return httpx.AsyncClient(
-        verify=certifi.where(),  # stable CA bundle
+        verify=certifi.where(),  # only used by env proxy mounts (ESRI_TRUST_ENV); the pool has its own
         trust_env=ESRI_TRUST_ENV,
         headers=DEFAULT_HEADERS,
         timeout=httpx.Timeout(
@@ -54,25 +140,104 @@ def build_esri_client() -> httpx.AsyncClient:
             write=ESRI_WRITE_TIMEOUT,
             pool=ESRI_POOL_TIMEOUT,
         ),
-        transport=httpx.AsyncHTTPTransport(retries=ESRI_RETRIES),
+        transport=transport or _esri_transport(pool),
         follow_redirects=True,
     )
 
-async def init_http_clients() -> None:
+def _host_pools() -> dict[str, tuple[PoolCfg, str]]:
+    """host → (merged PoolCfg, a service URL to warm against) from the catalogue."""
+    pools: dict[str, tuple[PoolCfg, str]] = {}
+    for cfg in catalogue_store.entries.values():
+        for layer in cfg.layers().values():
+            url = str(layer.url)
+            host = httpx.URL(url).host
+            pool, warm_url = pools.get(host, (layer.pool or PoolCfg(), url))
+            if layer.pool and pool is not layer.pool:
+                # several layers on one host: the most generous setting wins
+                pool = PoolCfg(
+                    max_connections=max(pool.max_connections, layer.pool.max_connections),
+                    max_keepalive_connections=max(pool.max_keepalive_connections, layer.pool.max_keepalive_connections),
+                    keepalive_expiry=max(pool.keepalive_expiry, layer.pool.keepalive_expiry),
+                    http2=pool.http2 or layer.pool.http2,
+                    warm_connections=max(pool.warm_connections, layer.pool.warm_connections),
+                )
+            pools[host] = (pool, warm_url)
+    return pools
+
+async def _prewarm(client: httpx.AsyncClient, url: str, connections: int) -> None:
+    """Open `connections` keep-alive connections (DNS + TCP + TLS) ahead of traffic."""
+    service_url = url.rsplit("/query", 1)[0]
+
+    async def touch() -> None:
+        with contextlib.suppress(Exception):
+            await client.get(service_url, params={"f": "json"}, timeout=ESRI_PREWARM_TIMEOUT)
+
+    await asyncio.gather(*(touch() for _ in range(max(connections, 0))))
+
+async def init_http_clients(
+    prewarm: bool | None = None, transport: httpx.AsyncBaseTransport | None = None
+) -> None:
     global _esri_client
     if _esri_client is None:
-        _esri_client = build_esri_client()
+        _esri_client = build_esri_client(transport=transport)
+        pools = _host_pools()
+        for host, (pool, _) in pools.items():
+            _host_clients[host] = build_esri_client(pool, transport)
+        # nothing to warm when every request goes to an injected transport
+        if transport is None and (ESRI_PREWARM if prewarm is None else prewarm):
+            await asyncio.gather(*(
+                _prewarm(_host_clients[host], warm_url, pool.warm_connections)
+                for host, (pool, warm_url) in pools.items()
+            ))
+    await init_response_cache()
 
 async def close_http_clients() -> None:
     global _esri_client
+    log.info("arcgis single-flight stats: %s", singleflight.stats())
+    await close_response_cache()
+    for client in _host_clients.values():
+        await client.aclose()
+    _host_clients.clear()
     if _esri_client is not None:
         await _esri_client.aclose()
         _esri_client = None
 
-def esri_client() -> httpx.AsyncClient:
+def esri_client(url: str | None = None) -> httpx.AsyncClient:
+    """Client for `url`'s host (its own pool if catalogued), else the default."""
     assert _esri_client is not None, "HTTP client not initialized; call init_http_clients() at startup."
+    if url is not None and _host_clients:
+        client = _host_clients.get(httpx.URL(url).host)
+        if client is not None:
+            return client
     return _esri_client
 
-def esri_ipv4_guard():
-    """Context manager you can 'with' around GETs to mimic curl -4."""
-    return force_ipv4_dns(ESRI_FORCE_IPV4_DNS)
+# ---------- Per-host concurrency cap (opt-in, e.g. bulk jobs) ----------
+class HostLimiter:
+    """Caps in-flight requests per upstream host; one semaphore per hostname."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._sems: dict[str, asyncio.Semaphore] = {}
+
+    def for_url(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        sem = self._sems.get(host)
+        if sem is None:
+            sem = self._sems[host] = asyncio.Semaphore(self.limit)
+        return sem
+
+_host_limiter: ContextVar[HostLimiter | None] = ContextVar("esri_host_limiter", default=None)
+
+def use_host_limiter(limiter: HostLimiter | None) -> None:
+    """Apply `limiter` to every ESRI request made from the current task."""
+    _host_limiter.set(limiter)
+
+@contextlib.asynccontextmanager
+async def esri_host_slot(url: str):
+    """Hold a per-host slot around a request if a HostLimiter is active."""
+    limiter = _host_limiter.get()
+    if limiter is None:
+        yield
+        return
+    async with limiter.for_url(url):
+        yield
@@ -0,0 +1,120 @@
+# app/services/parcel_cache.py
+"""
+Persistent lookup cache on top of get_utilities_for_parcel.
+
+Results are stored as shared Parcel rows (owner_id NULL) keyed by
+(apn, county, state). County and state are those of the catalogue entry
+the caller's spelling resolves to, so "Lee", "Lee County" and "12071"
+share one row. `data` holds {"found": bool, "utilities": {...}},
+`centroid` the parcel point and `updated_at` drives expiry. "Not found"
+results use a shorter TTL so newly published parcels show up quickly. When the caller owns a parcel
+with the same key, its centroid is filled from the cache row as well, so
+the owner-scoped spatial search sees single lookups too; on a cache hit
+only when that parcel has no centroid yet.
+"""
+from __future__ import annotations
+
+import contextlib
+from datetime import datetime, timedelta
+from typing import Optional
+
+from slugify import slugify
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.loader import catalogue_store
+from ..core.config import settings
+from ..crud.crud_parcel import crud_parcel
+from ..models.parcel import Parcel
+from ..schemas.parcel import ParcelUtilityInfo
+from .parcel_lookup import get_raw_utilities, get_utilities_for_parcel, utility_info_from_raw
+from .response_cache import skip_cache_reads
+
+
+def cache_key(apn: str, county: str, state: str) -> tuple[str, str, str]:
+    """(apn, county slug, STATE); catalogue counties use their canonical name however they were typed."""
+    cfg = catalogue_store.resolve(county, state)
+    if cfg is not None:
+        county, state = cfg.name, cfg.state
+    return apn.strip(), slugify(county), state.strip().upper()
+
+
+def _found(raw: Optional[dict]) -> bool:
+    """Whether upstream knows the parcel: a geometry or an FLWMI row came back."""
+    return raw is not None and (raw["lon"] is not None or raw["has_wells_row"])
+
+
+def _is_fresh(entry: Parcel) -> bool:
+    found = bool((entry.data or {}).get("found"))
+    ttl = settings.PARCEL_CACHE_TTL_SECONDS if found else settings.PARCEL_CACHE_NEGATIVE_TTL_SECONDS
+    return entry.updated_at >= datetime.utcnow() - timedelta(seconds=ttl)
+
+
+async def lookup_with_cache(
+    db: AsyncSession,
+    *,
+    apn: str,
+    address: Optional[str],
+    county: Optional[str],
+    state: Optional[str],
+    refresh: bool = False,
+    owner_id: Optional[int] = None,
+) -> Optional[ParcelUtilityInfo]:
+    """
+    Serve from Postgres when a fresh entry exists; otherwise query ArcGIS and
+    store the outcome. `refresh=True` skips the reads (here and in the Redis
+    response cache) but still writes back.
+    Upstream errors propagate and are never cached. With `owner_id`, the
+    owner's matching parcel gets the cached centroid.
+    """
+    # a refresh must reach ArcGIS, not the shared Redis response cache
+    upstream = skip_cache_reads() if refresh else contextlib.nullcontext()
+    if not (settings.PARCEL_CACHE_ENABLED and apn and county and state):
+        with upstream:
+            return await get_utilities_for_parcel(apn=apn, address=address, county=county, state=state)
+
+    key = cache_key(apn, county, state)
+    key_apn, key_county, key_state = key
+
+    if not refresh:
+        entry = await crud_parcel.get_cached(db, apn=key_apn, county=key_county, state=key_state)
+        if entry is not None and _is_fresh(entry):
+            utilities = (entry.data or {}).get("utilities")
+            if entry.centroid is not None:
+                # keep hits read-only unless the owner's parcel still lacks a point
+                await _locate_owned(db, owner_id, apn, county, state, key, only_missing=True)
+            return ParcelUtilityInfo(**utilities) if utilities else None
+
+    with upstream:
+        raw = await get_raw_utilities(apn=apn, address=address, county=county, state=state)
+    info = utility_info_from_raw(apn, raw) if raw is not None else None
+    point = (raw["lon"], raw["lat"]) if raw and raw["lon"] is not None else None
+    await crud_parcel.upsert_cached(
+        db,
+        apn=key_apn,
+        county=key_county,
+        state=key_state,
+        street_address=address,
+        data={
+            "found": _found(raw),
+            "utilities": info.model_dump() if info else None,
+        },
+        point=point,
+    )
+    await _locate_owned(db, owner_id, apn, county, state, key)
+    return info
+
+
+async def _locate_owned(
+    db: AsyncSession,
+    owner_id: Optional[int],
+    apn: str,
+    county: str,
+    state: str,
+    key: tuple[str, str, str],
+    only_missing: bool = False,
+) -> None:
+    if owner_id is not None:
+        await crud_parcel.copy_cached_centroid(
+            db, owner_id=owner_id, apn=apn.strip(), county=county, state=state, cache_key=key,
+            only_missing=only_missing,
+        )
@@ -8,17 +8,34 @@ from typing import Any, Optional
 from pydantic import BaseModel
 from slugify import slugify 
 
-from ..services.http_client import esri_client, esri_ipv4_guard
+from ..services.http_client import esri_client, esri_host_slot
+from ..services.response_cache import cached_fetch, cache_key, skipping_reads
+from ..services.singleflight import SingleFlight
+from ..services import territory_index, host_guard
 from ..schemas.parcel import ParcelUtilityInfo
-from ..config.loader import load_catalogue
+from ..config.loader import catalogue_store
 from ..config.models import LayerCfg, CountyCfg
 
-CATALOGUE = load_catalogue()          #one global source of truth
+_inflight = SingleFlight()            # coalesces identical concurrent queries
 HTTP_TIMEOUT = httpx.Timeout(10.0)
 
 # services/utility_lookup.py  – inside _parcel_geometry
 
 
+# tokens _parse_bool understands (compared lower-cased with spaces removed;
+# shared with the vectorised classifier in services/columnar.py)
+_TRUTHY = {
+    "y", "yes", "true", "1",
+    "knownwell", "known septic", "knownseptic",  # FL DOH layer
+    "knownwellandseptic", "known well", "known septic",
+    "private", "onsite", "available", "LikelySeptic", "LikelyWell", 
+    "LikelySewer", "Known Public", "Likely Public", "Known Sewer"
+}
+_FALSY = {
+    "n", "no", "false", "0",
+    "none", "public", "notavailable", "unknown", "na"
+}
+
 def _parse_bool(v: Any) -> bool | None:
     """
     Interprets a wide variety of truthy / falsy tokens used in ArcGIS layers.
@@ -31,21 +48,9 @@ def _parse_bool(v: Any) -> bool | None:
 
     s = str(v).strip().lower()
 
-    truthy = {
-        "y", "yes", "true", "1",
-        "knownwell", "known septic", "knownseptic",  # FL DOH layer
-        "knownwellandseptic", "known well", "known septic",
-        "private", "onsite", "available", "LikelySeptic", "LikelyWell", 
-        "LikelySewer", "Known Public", "Likely Public", "Known Sewer"
-    }
-    falsy = {
-        "n", "no", "false", "0",
-        "none", "public", "notavailable", "unknown", "na"
-    }
-
-    if s.replace(" ", "") in truthy:
+    if s.replace(" ", "") in _TRUTHY:
         return True
-    if s.replace(" ", "") in falsy:
+    if s.replace(" ", "") in _FALSY:
         return False
     return None
 
@@ -88,45 +93,69 @@ def _pick_most_recent(rows: list[dict]) -> dict | None:
 
 def _catalogue_entry(place: str, state: str) -> CountyCfg | None:
     """
-    Try a few slug patterns so callers can supply either a city
-    ('Lehigh Acres') or a county ('Lee County' or 'Lee').
+    Callers can supply a city ('Lehigh Acres'), a county ('Lee County' or
+    'Lee') or a FIPS code; all resolve through the catalogue's alias index.
     """
-    if not place:
-        return None
+    return catalogue_store.resolve(place, state)
 
-    variants = {
-        f"{slugify(place)}_{state.lower()}",
-        f"{slugify(place).replace('-', '')}_{state.lower()}",
-        f"{slugify(place).replace('-', '_')}_{state.lower()}",
-    }
-    for key in variants:
-        if key in CATALOGUE:
-            return CATALOGUE[key]
-    return None
-
-async def _arcgis_query(layer: LayerCfg, extra_params: dict[str, Any]) -> dict:
+async def _arcgis_query(layer: LayerCfg, extra_params: dict[str, Any], method: str = "GET") -> dict:
     """
     Central ArcGIS call path:
-    - Uses shared client (HTTP/1.1, certifi, retries)
-    - Optional IPv4-only DNS (like curl -4)
+    - Identical concurrent calls share one upstream request (single-flight)
+    - Shared Redis response cache (per-layer TTL, stale-while-revalidate;
+      reads skipped under response_cache.skip_cache_reads())
+    - Uses the host's pooled client (certifi, retries, cached IPv4-first DNS)
     - Small extra retry for transient timeouts
+    Use method="POST" for long where clauses (batched IN lists).
     """
     params = layer.static_params | extra_params
     url: str = str(layer.url)
-    client = esri_client()
+    key = cache_key(url, params)
+    if skipping_reads():
+        key += ":fresh"   # a refresh must not join a call that may be served from Redis
+    return await _inflight.do(
+        key,
+        lambda: cached_fetch(
+            url,
+            params,
+            lambda: _arcgis_fetch(url, params, method),
+            ttl=layer.cache_ttl,
+            stale_ttl=layer.cache_stale_ttl,
+        ),
+    )
+
+async def _arcgis_fetch(url: str, params: dict[str, Any], method: str = "GET") -> bytes:
+    """
+    Perform the upstream request and return the raw JSON body. Each attempt
+    goes through the host's guard (adaptive concurrency + circuit breaker);
+    the one extra retry is only taken while the host's retry budget allows.
+    """
+    client = esri_client(url)
+    guard = host_guard.guard_for(url)
+    if method == "POST":
+        # ArcGIS takes the same parameters form-encoded; booleans as "true"/"false"
+        form = {k: (str(v).lower() if isinstance(v, bool) else str(v)) for k, v in params.items()}
 
     for attempt in range(1, 3):  # extra retry layer over transport retries
         try:
-            # Force IPv4 DNS resolution if enabled (matches your working one-shot)
-            with esri_ipv4_guard():
-                r = await client.get(url, params=params)
-            r.raise_for_status()
-            return r.json()
+            # DNS (cached, IPv4-first) is handled by the client's resolver backend
+            async with esri_host_slot(url), guard.slot():
+                if method == "POST":
+                    r = await client.post(url, data=form)
+                else:
+                    r = await client.get(url, params=params)
+                r.raise_for_status()
+            return r.content
         except (httpx.ConnectTimeout, httpx.ReadTimeout, httpx.RemoteProtocolError):
-            if attempt >= 2:
+            if attempt >= 2 or not guard.try_retry():
                 raise
             await asyncio.sleep(0.25 * attempt + random.random() * 0.25)
     
+def _centroid(geom: dict) -> dict:
+    # ArcGIS geometries are in arrays; get centroid for point-in‑polygon query
+    centroid = geom.get("centroid") or geom["rings"][0][0]
+    return {"lon": centroid[0], "lat": centroid[1]}
+
 async def _parcel_geometry(layer: LayerCfg, apn: str, address: Optional[str], id_field: str) -> Optional[dict]:
     """Return centroid geometry for the parcel—or None if not found."""
     where = f"{id_field}='{apn}'" if apn else f"SiteAddress ILIKE '{address}%'" 
@@ -136,12 +165,14 @@ async def _parcel_geometry(layer: LayerCfg, apn: str, address: Optional[str], id
     )
     if not data.get("features"):
         return None
-    geom = data["features"][0]["geometry"]
-    # ArcGIS geometries are in arrays; get centroid for point-in‑polygon query
-    centroid = geom.get("centroid") or geom["rings"][0][0]
-    return {"lon": centroid[0], "lat": centroid[1]}
+    return _centroid(data["features"][0]["geometry"])
 
 async def _point_in_layer(layer: LayerCfg, lon: float, lat: float) -> Optional[str]:
+    # local snapshot first; live query only when it's missing or stale
+    answered, provider = territory_index.lookup(layer, lon, lat)
+    if answered:
+        return provider
+
     payload = {
         "geometry": json.dumps({
             "x": lon,
@@ -208,55 +239,254 @@ def _classify_water_sewer(dw: str | None, ww: str | None) -> tuple[bool | None,
 
     return well_available, water_connected, sewer_connected
 
+async def _fetch_layer(
+    cfg: CountyCfg,
+    name: str,
+    layer: LayerCfg,
+    apn: str,
+    address: Optional[str],
+    deps: dict[str, Any],
+) -> Any:
+    """Run the query for one catalogue layer given its resolved dependencies."""
+    if name == "parcel_layer":
+        return await _parcel_geometry(layer, apn, address, cfg.id_field)
+    if name == "wells_layer":
+        return await _utilities_for_parcel(layer, apn)
+
+    # everything else is a territory layer queried by the parcel centroid
+    geom = deps.get("parcel_layer")
+    if not geom:
+        return None
+    return await _point_in_layer(layer, geom["lon"], geom["lat"])
+
+async def _resolve_layers(
+    cfg: CountyCfg,
+    apn: str,
+    address: Optional[str],
+    prefetched: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    """
+    Query every layer of `cfg` concurrently, honouring each layer's
+    `depends_on`: a layer starts as soon as the layers it needs have resolved.
+    Layers present in `prefetched` (see prefetch_batch) are not queried.
+    Returns {layer_name: result}.
+    """
+    prefetched = prefetched or {}
+    tasks: dict[str, asyncio.Task] = {}
+    layers = cfg.layers()
+
+    def schedule(name: str) -> asyncio.Task:
+        if name not in tasks:
+            layer = layers[name]
+            dep_tasks = {dep: schedule(dep) for dep in layer.depends_on}
+
+            async def run() -> Any:
+                deps = {dep: await task for dep, task in dep_tasks.items()}
+                if name in prefetched:
+                    return prefetched[name]
+                return await _fetch_layer(cfg, name, layer, apn, address, deps)
+
+            tasks[name] = asyncio.create_task(run())
+        return tasks[name]
+
+    for name in layers:
+        schedule(name)
+
+    try:
+        values = await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return dict(zip(tasks.keys(), values))
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Batched attribute queries (bulk mode)
+# ──────────────────────────────────────────────────────────────────────────────
+
+# upper bound on IN (...) list length regardless of maxRecordCount
+ARCGIS_MAX_IN_LIST = 500
+
+def _sql_in(field: str, values: list[str]) -> str:
+    quoted = ",".join("'" + v.replace("'", "''") + "'" for v in values)
+    return f"{field} IN ({quoted})"
+
+def _id_key(value: Any) -> str:
+    # the server matches IDs loosely (case, padding); compare the same way
+    return str(value).strip().upper() if value is not None else ""
+
+def _by_id_key(apns: list[str]) -> dict[str, str]:
+    return {_id_key(a): a for a in apns}
+
+def _complete(data: dict) -> bool:
+    """
+    True when a batch response lists every match, so absent ids are real
+    misses. ArcGIS reports query failures (e.g. a where clause too long) as
+    HTTP 200 with an "error" body; those answer nothing.
+    """
+    return "error" not in data and not data.get("exceededTransferLimit")
+
+def _chunks(values: list[str], layer: LayerCfg) -> list[list[str]]:
+    size = max(1, min(layer.max_record_count, ARCGIS_MAX_IN_LIST))
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+async def _parcel_geometries_batch(
+    layer: LayerCfg, id_field: str, apns: list[str]
+) -> tuple[dict[str, Optional[dict]], set[str]]:
+    """
+    One IN (...) query per chunk. Returns ({apn: centroid or None}, answered):
+    apns missing from a complete (non-truncated, non-error) response are
+    known misses.
+    """
+    found: dict[str, Optional[dict]] = {}
+    answered: set[str] = set()
+
+    async def run(chunk: list[str]) -> None:
+        data = await _arcgis_query(
+            layer,
+            {"where": _sql_in(id_field, chunk), "returnGeometry": True, "outSR": 4326},
+            method="POST",
+        )
+        wanted = _by_id_key(chunk)
+        for feat in data.get("features", []):
+            apn = wanted.get(_id_key((feat.get("attributes") or {}).get(id_field)))
+            if apn is not None and apn not in found and feat.get("geometry"):
+                found[apn] = _centroid(feat["geometry"])
+        if _complete(data):
+            answered.update(chunk)
+
+    await asyncio.gather(*(run(c) for c in _chunks(apns, layer)))
+    return found, answered
+
+async def _wells_rows_batch(
+    layer: LayerCfg, straps: list[str]
+) -> tuple[dict[str, list[dict]], set[str]]:
+    """Batched form of _utilities_for_parcel: PARCELNO / ALT_KEY IN (...)."""
+    rows: dict[str, list[dict]] = {}
+    answered: set[str] = set()
+
+    async def run(chunk: list[str]) -> None:
+        where = f"{_sql_in('PARCELNO', chunk)} OR {_sql_in('ALT_KEY', chunk)}"
+        data = await _arcgis_query(
+            layer, {"where": where, "returnGeometry": False, "outSR": 4326}, method="POST"
+        )
+        wanted = _by_id_key(chunk)
+        for feat in data.get("features", []):
+            attrs = feat.get("attributes") or {}
+            keys = {_id_key(attrs.get("PARCELNO")), _id_key(attrs.get("ALT_KEY"))}
+            for apn in {wanted[k] for k in keys if k in wanted}:
+                rows.setdefault(apn, []).append(attrs)
+        if _complete(data):
+            answered.update(chunk)
+
+    await asyncio.gather(*(run(c) for c in _chunks(straps, layer)))
+    return rows, answered
+
+async def prefetch_batch(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    For a batch of bulk rows (apn / county / state), group by county and fetch
+    parcel geometry and wells rows with batched IN (...) queries. Returns one
+    `prefetched` dict per input row for get_utilities_for_parcel; a layer is
+    only included for a row when the batch answered it, so misses from
+    truncated responses fall back to the single-row query.
+    """
+    by_cfg: dict[int, tuple[CountyCfg, set[str]]] = {}
+    row_cfg: list[Optional[CountyCfg]] = []
+    for row in rows:
+        apn, county, state = row.get("apn"), row.get("county"), row.get("state")
+        cfg = _catalogue_entry(county, state) if apn and county and state else None
+        row_cfg.append(cfg)
+        if cfg is not None:
+            by_cfg.setdefault(id(cfg), (cfg, set()))[1].add(str(apn))
+
+    geoms: dict[int, tuple[dict, set[str]]] = {}
+    wells: dict[int, tuple[dict, set[str]]] = {}
+
+    async def run(key: int, cfg: CountyCfg, apns: list[str]) -> None:
+        jobs = [_parcel_geometries_batch(cfg.parcel_layer, cfg.id_field, apns)]
+        wells_layer = getattr(cfg, "wells_layer", None)
+        if wells_layer:
+            jobs.append(_wells_rows_batch(wells_layer, apns))
+        out = await asyncio.gather(*jobs)
+        geoms[key] = out[0]
+        if wells_layer:
+            wells[key] = out[1]
+
+    await asyncio.gather(*(run(k, cfg, sorted(apns)) for k, (cfg, apns) in by_cfg.items()))
+
+    prefetched: list[dict[str, Any]] = []
+    for row, cfg in zip(rows, row_cfg):
+        pre: dict[str, Any] = {}
+        if cfg is not None:
+            apn = str(row["apn"])
+            found, answered = geoms[id(cfg)]
+            if apn in found or apn in answered:
+                pre["parcel_layer"] = found.get(apn)
+            if id(cfg) in wells:
+                wrows, wanswered = wells[id(cfg)]
+                if apn in wrows or apn in wanswered:
+                    pre["wells_layer"] = wrows.get(apn, [])
+        prefetched.append(pre)
+    return prefetched
+
 # ──────────────────────────────────────────────────────────────────────────────
 #  Public API
 # ──────────────────────────────────────────────────────────────────────────────
 
 # geometry query → point‑in‑polygon → build ParcelUtilityInfo
-async def get_utilities_for_parcel(
+async def get_raw_utilities(
     apn: str,
     address: Optional[str],
     county: str,
     state: str,
-) -> Optional[ParcelUtilityInfo]:
-    """Core business logic—kept framework agnostic for re use in Celery, etc."""
+    prefetched: Optional[dict[str, Any]] = None,
+) -> Optional[dict[str, Any]]:
+    """
+    Unclassified layer values for one parcel: providers, the FLWMI DW/WW
+    strings and the parcel centroid. None when the county isn't in the catalogue. Bulk jobs keep
+    these as columns (services/columnar.py); single lookups go through
+    get_utilities_for_parcel.
+    `prefetched` carries layer results already fetched by prefetch_batch.
+    """
     cfg = _catalogue_entry(county, state)
     if not cfg:
         return None
 
-    # 1) Fetch parcel geometry
-    geom = await _parcel_geometry(cfg.parcel_layer, apn, address, cfg.id_field)
-
-    if geom:
-        lon, lat = geom["lon"], geom["lat"]
-        electric = await _point_in_layer(cfg.electric_territory_layer, lon, lat)
-        water = await _point_in_layer(cfg.water_layer, lon, lat) 
-        sewer = await _point_in_layer(cfg.sewer_layer, lon, lat)
-    else:
-        electric = None
-        water =  None
-        sewer = None
+    # independent layers (parcel geometry, wells) start together; the
+    # territory layers fan out as soon as the geometry resolves
+    results = await _resolve_layers(cfg, apn, address, prefetched)
+    rows = results.get("wells_layer")
+    row = rows[0] if rows else None        # FLWMI = one row per parcel
+    point = results.get("parcel_layer") or {}
+    return {
+        "lon": point.get("lon"),           # parcel centroid, EPSG:4326
+        "lat": point.get("lat"),
+        "electric": results.get("electric_territory_layer"),
+        "water": results.get("water_layer"),
+        "sewer": results.get("sewer_layer"),
+        "has_wells_row": row is not None,
+        "dw": row.get("DW") if row else None,
+        "ww": row.get("WW") if row else None,
+    }
 
+def utility_info_from_raw(apn: str, raw: dict[str, Any]) -> ParcelUtilityInfo:
+    electric, water, sewer = raw["electric"], raw["water"], raw["sewer"]
 
     well_available: Optional[bool] = None
     septic_present: Optional[bool] = None
     water_connected: Optional[bool] = None
     sewer_connected: Optional[bool] = None
 
-    wells_layer = getattr(cfg, "wells_layer", None)
-    if wells_layer:
-        rows = await _utilities_for_parcel(wells_layer, apn)
-        if rows:
-            row = rows[0]                      # FLWMI = one row per parcel
-            well_available, water_connected, sewer_connected = _classify_water_sewer(
-                row.get("DW"), row.get("WW")
-            )
-            # septic_present duplicated for clarity
-            septic_present = None
-            if sewer_connected is not None:
-                septic_present = not sewer_connected
-            elif row.get("WW"):
-                septic_present = _parse_bool(row["WW"])
+    if raw["has_wells_row"]:
+        well_available, water_connected, sewer_connected = _classify_water_sewer(
+            raw["dw"], raw["ww"]
+        )
+        # septic_present duplicated for clarity
+        septic_present = None
+        if sewer_connected is not None:
+            septic_present = not sewer_connected
+        elif raw["ww"]:
+            septic_present = _parse_bool(raw["ww"])
 
     return ParcelUtilityInfo(
         apn=apn,
@@ -271,3 +501,16 @@ async def get_utilities_for_parcel(
         water_connected=water_connected if water_connected else False,
         sewer_connected=sewer_connected if sewer_connected else False
     )
+
+async def get_utilities_for_parcel(
+    apn: str,
+    address: Optional[str],
+    county: str,
+    state: str,
+    prefetched: Optional[dict[str, Any]] = None,
+) -> Optional[ParcelUtilityInfo]:
+    """Core business logic—kept framework agnostic for re use in Celery, etc."""
+    raw = await get_raw_utilities(apn, address, county, state, prefetched)
+    if raw is None:
+        return None
+    return utility_info_from_raw(apn, raw)
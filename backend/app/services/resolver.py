@@ -0,0 +1,117 @@
+# app/services/resolver.py
+"""
+DNS cache for the ESRI clients, plugged in as an httpcore network backend.
+
+Replaces the old process-wide socket.getaddrinfo swap: resolution is
+async (loop.getaddrinfo), scoped to the clients that install it, cached
+per host for ESRI_DNS_TTL seconds, and IPv4 addresses are tried first
+(like curl -4). With ESRI_FORCE_IPV4_DNS, IPv6 results are dropped
+whenever an IPv4 address exists. The connect timeout covers resolution
+and every address tried together. TLS is unaffected: httpcore connects to
+the resolved IP but still sends the original hostname as SNI.
+"""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import socket
+import time
+from typing import Iterable, Optional
+
+import httpcore
+
+
+class CachingResolverBackend(httpcore.AsyncNetworkBackend):
+    def __init__(
+        self,
+        ttl: float,
+        ipv4_only: bool = False,
+        inner: Optional[httpcore.AsyncNetworkBackend] = None,
+    ):
+        self.ttl = ttl
+        self.ipv4_only = ipv4_only
+        self._inner = inner or httpcore.AnyIOBackend()
+        self._cache: dict[tuple[str, int], tuple[float, list[str]]] = {}
+        self._pending: dict[tuple[str, int], asyncio.Task] = {}
+
+    # ---------- resolution ----------
+    async def _lookup(self, host: str, port: int) -> list[str]:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        v4 = [info[4][0] for info in infos if info[0] == socket.AF_INET]
+        v6 = [info[4][0] for info in infos if info[0] == socket.AF_INET6]
+        addrs = v4 if (self.ipv4_only and v4) else v4 + v6
+        return list(dict.fromkeys(addrs))   # de-dupe, keep order
+
+    async def resolve(self, host: str, port: int) -> list[str]:
+        key = (host, port)
+        hit = self._cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+
+        task = self._pending.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._lookup(host, port))
+            self._pending[key] = task
+        try:
+            addrs = await asyncio.shield(task)
+        finally:
+            if task.done() and self._pending.get(key) is task:
+                del self._pending[key]
+        if addrs:
+            self._cache[key] = (time.monotonic() + self.ttl, addrs)
+        return addrs
+
+    def forget(self, host: str, port: int) -> None:
+        self._cache.pop((host, port), None)
+
+    # ---------- AsyncNetworkBackend ----------
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        # `timeout` bounds the whole connect (DNS + every address tried),
+        # not each step, so a host with several dead addresses can't take
+        # a multiple of ESRI_CONNECT_TIMEOUT
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def remaining() -> Optional[float]:
+            if deadline is None:
+                return None
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise httpcore.ConnectTimeout(f"connecting to {host}:{port} timed out after {timeout}s")
+            return left
+
+        try:
+            ipaddress.ip_address(host)
+            addrs = [host]
+        except ValueError:
+            try:
+                addrs = await asyncio.wait_for(self.resolve(host, port), remaining())
+            except asyncio.TimeoutError:      # before OSError: it is one since 3.11
+                raise httpcore.ConnectTimeout(f"resolving {host} timed out after {timeout}s") from None
+            except OSError as exc:
+                raise httpcore.ConnectError(str(exc)) from exc
+
+        last: Exception = httpcore.ConnectError(f"no addresses for {host}")
+        for addr in addrs:
+            left = remaining()
+            try:
+                return await self._inner.connect_tcp(
+                    addr, port, timeout=left, local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                last = exc
+        # every cached address failed: re-resolve next time
+        self.forget(host, port)
+        raise last
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._inner.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._inner.sleep(seconds)
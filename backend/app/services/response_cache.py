@@ -0,0 +1,216 @@
+# app/services/response_cache.py
+"""
+Shared Redis cache for ArcGIS query responses.
+
+Every gunicorn and Celery process reads/writes the same keys, so one
+process's upstream call serves all the others. Entries are the raw JSON
+body, zlib-compressed, prefixed with the time they were fetched; that
+timestamp drives stale-while-revalidate: past `ttl` (but within
+`ttl + stale_ttl`) the stale body is returned immediately and a single
+background refresh is started.
+
+Redis is strictly best-effort: any Redis failure degrades to a direct
+upstream call. Inside `skip_cache_reads()` (the refresh path) nothing is
+read from Redis, but fresh bodies are still written back.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+import httpx
+
+from . import singleflight
+
+log = logging.getLogger(__name__)
+
+# ---------- Tunables via env ----------
+ARCGIS_CACHE_ENABLED = os.getenv("ARCGIS_CACHE_ENABLED", "true").lower() in {"1", "true", "yes"}
+ARCGIS_CACHE_PREFIX = os.getenv("ARCGIS_CACHE_PREFIX", "arcgis:v1:")
+ARCGIS_CACHE_LEVEL = int(os.getenv("ARCGIS_CACHE_ZLIB_LEVEL", "6"))
+# cross-process single-flight: on a miss only the lock holder goes upstream,
+# others poll the cache until the lock expires
+ARCGIS_SINGLEFLIGHT_LOCK = os.getenv("ARCGIS_SINGLEFLIGHT_LOCK", "true").lower() in {"1", "true", "yes"}
+ARCGIS_SINGLEFLIGHT_LOCK_MS = int(os.getenv("ARCGIS_SINGLEFLIGHT_LOCK_MS", "15000"))
+ARCGIS_SINGLEFLIGHT_POLL_MS = int(os.getenv("ARCGIS_SINGLEFLIGHT_POLL_MS", "100"))
+
+_HEADER = struct.Struct("!d")   # fetched-at epoch seconds
+
+_redis: Any = None
+_refreshing: set[str] = set()
+_background: set[asyncio.Task] = set()
+_skip_reads: ContextVar[bool] = ContextVar("arcgis_cache_skip_reads", default=False)
+
+
+async def init_response_cache() -> None:
+    global _redis
+    if ARCGIS_CACHE_ENABLED and _redis is None:
+        import redis.asyncio as aioredis
+        # read here, not at import: parcel_lookup must stay importable without settings
+        from ..core.config import settings
+        _redis = aioredis.from_url(settings.REDIS_URL)
+
+
+async def close_response_cache() -> None:
+    global _redis
+    for task in list(_background):
+        task.cancel()
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+@contextlib.contextmanager
+def skip_cache_reads() -> Iterator[None]:
+    """Go upstream for every query made from the current task (and the tasks it starts)."""
+    token = _skip_reads.set(True)
+    try:
+        yield
+    finally:
+        _skip_reads.reset(token)
+
+
+def skipping_reads() -> bool:
+    return _skip_reads.get()
+
+
+def cache_key(url: str, params: dict[str, Any]) -> str:
+    """Layer URL + params normalised the way httpx will encode them."""
+    items = sorted(httpx.QueryParams(params).multi_items())
+    digest = hashlib.sha256(json.dumps([url, items], separators=(",", ":")).encode()).hexdigest()
+    return ARCGIS_CACHE_PREFIX + digest
+
+
+def _encode(body: bytes) -> bytes:
+    return _HEADER.pack(time.time()) + zlib.compress(body, ARCGIS_CACHE_LEVEL)
+
+
+def _decode(blob: bytes) -> tuple[float, dict]:
+    (fetched_at,) = _HEADER.unpack_from(blob)
+    return fetched_at, json.loads(zlib.decompress(blob[_HEADER.size:]))
+
+
+def _cacheable(data: Any) -> bool:
+    # ArcGIS reports failures as HTTP 200 + {"error": {...}}; never cache those
+    return isinstance(data, dict) and "error" not in data
+
+
+async def _store(key: str, body: bytes, ttl: int, stale_ttl: int) -> None:
+    try:
+        await _redis.set(key, _encode(body), ex=ttl + stale_ttl)
+    except Exception as exc:
+        log.warning("arcgis cache write failed: %s", exc)
+
+
+async def _refresh(key: str, fetch: Callable[[], Awaitable[bytes]], ttl: int, stale_ttl: int) -> None:
+    try:
+        body = await fetch()
+        if _cacheable(json.loads(body)):
+            await _store(key, body, ttl, stale_ttl)
+    except Exception as exc:
+        log.info("arcgis background revalidation failed: %s", exc)
+    finally:
+        _refreshing.discard(key)
+
+
+async def cached_fetch(
+    url: str,
+    params: dict[str, Any],
+    fetch: Callable[[], Awaitable[bytes]],
+    *,
+    ttl: int,
+    stale_ttl: Optional[int] = None,
+) -> dict:
+    """
+    Return the parsed JSON for (url, params), from Redis when possible.
+    `fetch` performs the real request and returns the raw response body.
+    `ttl` <= 0 disables caching for the call; under skip_cache_reads() the
+    body is always fetched, then stored.
+    """
+    if _redis is None or ttl <= 0:
+        return json.loads(await fetch())
+
+    stale_ttl = ttl if stale_ttl is None else stale_ttl
+    key = cache_key(url, params)
+    if _skip_reads.get():
+        return await _fetch_and_store(key, fetch, ttl, stale_ttl)
+
+    try:
+        blob = await _redis.get(key)
+    except Exception as exc:
+        log.warning("arcgis cache read failed: %s", exc)
+        blob = None
+
+    if blob:
+        try:
+            fetched_at, data = _decode(blob)
+        except Exception:
+            data = None
+        else:
+            age = time.time() - fetched_at
+            if age < ttl:
+                return data
+            if age < ttl + stale_ttl:
+                if key not in _refreshing:
+                    _refreshing.add(key)
+                    task = asyncio.create_task(_refresh(key, fetch, ttl, stale_ttl))
+                    _background.add(task)
+                    task.add_done_callback(_background.discard)
+                return data
+
+    if ARCGIS_SINGLEFLIGHT_LOCK:
+        lock = key + ":lock"
+        try:
+            leader = await _redis.set(lock, b"1", nx=True, px=ARCGIS_SINGLEFLIGHT_LOCK_MS)
+        except Exception as exc:
+            log.warning("arcgis single-flight lock failed: %s", exc)
+            leader = True
+        if not leader:
+            data = await _await_peer(key)
+            if data is not None:
+                singleflight.record("coalesced_remote")
+                return data
+            singleflight.record("lock_timeouts")
+        try:
+            return await _fetch_and_store(key, fetch, ttl, stale_ttl)
+        finally:
+            if leader:
+                try:
+                    await _redis.delete(lock)
+                except Exception:
+                    pass   # expires on its own
+
+    return await _fetch_and_store(key, fetch, ttl, stale_ttl)
+
+
+async def _fetch_and_store(key: str, fetch: Callable[[], Awaitable[bytes]], ttl: int, stale_ttl: int) -> dict:
+    body = await fetch()
+    data = json.loads(body)
+    if _cacheable(data):
+        await _store(key, body, ttl, stale_ttl)
+    return data
+
+
+async def _await_peer(key: str) -> Optional[dict]:
+    """Poll for another process's result until its lock expires or is released."""
+    deadline = time.monotonic() + ARCGIS_SINGLEFLIGHT_LOCK_MS / 1000
+    while time.monotonic() < deadline:
+        await asyncio.sleep(ARCGIS_SINGLEFLIGHT_POLL_MS / 1000)
+        try:
+            blob = await _redis.get(key)
+            if blob:
+                return _decode(blob)[1]
+            if not await _redis.exists(key + ":lock"):
+                return None   # leader gave up (error / uncacheable); go ourselves
+        except Exception:
+            return None
+    return None
@@ -0,0 +1,51 @@
+# app/services/singleflight.py
+"""
+Coalesce identical in-flight requests.
+
+The first caller for a key starts the work in its own task; callers that
+arrive while it's running await the same task and get the same parsed
+result (treat it as read-only). The work runs detached from any one
+caller, so a cancelled caller never cancels it for the others.
+Cross-process coalescing lives in response_cache (short Redis lock).
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable
+
+# leader / coalesced_local / coalesced_remote / lock_timeouts
+_stats: Counter = Counter()
+
+
+def record(event: str, n: int = 1) -> None:
+    _stats[event] += n
+
+
+def stats() -> dict[str, int]:
+    """Snapshot of the counters; coalesced_* are upstream calls saved."""
+    return dict(_stats)
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            record("leader")
+        else:
+            record("coalesced_local")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # every waiter may have been cancelled; don't let asyncio log the
+        # failure as "never retrieved" — callers that are still waiting get it
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,209 @@
+# app/services/territory_index.py
+"""
+Local snapshots of utility territory layers for offline point-in-polygon.
+
+`sync_layer` pages every polygon of a territory layer (objectIds in chunks
+of the server's maxRecordCount) into a JSON snapshot on disk.
+`lookup` answers point-in-polygon from that snapshot through a small
+bounding-box tree plus exact ray casting, so `_point_in_layer` only needs
+a live ArcGIS query when the snapshot is missing or stale.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from ..config.models import LayerCfg
+
+log = logging.getLogger(__name__)
+
+# ---------- Tunables via env ----------
+TERRITORY_SNAPSHOT_DIR = Path(
+    os.getenv("TERRITORY_SNAPSHOT_DIR", str(Path(tempfile.gettempdir()) / "utilix-territories"))
+)
+TERRITORY_RECHECK_SECONDS = float(os.getenv("TERRITORY_RECHECK_SECONDS", "60"))
+_LEAF_SIZE = 8
+
+BBox = tuple[float, float, float, float]   # minx, miny, maxx, maxy
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Geometry
+# ──────────────────────────────────────────────────────────────────────────────
+def _rings_bbox(rings: list[list[list[float]]]) -> BBox:
+    xs = [pt[0] for ring in rings for pt in ring]
+    ys = [pt[1] for ring in rings for pt in ring]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _point_in_rings(x: float, y: float, rings: list[list[list[float]]]) -> bool:
+    """Even-odd ray casting over all rings, so Esri holes are handled too."""
+    inside = False
+    for ring in rings:
+        n = len(ring)
+        j = n - 1
+        for i in range(n):
+            xi, yi = ring[i][0], ring[i][1]
+            xj, yj = ring[j][0], ring[j][1]
+            if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+                inside = not inside
+            j = i
+    return inside
+
+
+class _Node:
+    __slots__ = ("bbox", "children", "items")
+
+    def __init__(self, bbox: BBox, children: list["_Node"] | None = None, items: list[int] | None = None):
+        self.bbox = bbox
+        self.children = children or []
+        self.items = items or []
+
+
+def _union(boxes: list[BBox]) -> BBox:
+    return (
+        min(b[0] for b in boxes), min(b[1] for b in boxes),
+        max(b[2] for b in boxes), max(b[3] for b in boxes),
+    )
+
+
+def _build(ids: list[int], boxes: list[BBox], depth: int = 0) -> _Node:
+    bbox = _union([boxes[i] for i in ids])
+    if len(ids) <= _LEAF_SIZE:
+        return _Node(bbox, items=ids)
+    axis = depth % 2
+    ids = sorted(ids, key=lambda i: boxes[i][axis] + boxes[i][axis + 2])
+    mid = len(ids) // 2
+    return _Node(bbox, children=[_build(ids[:mid], boxes, depth + 1), _build(ids[mid:], boxes, depth + 1)])
+
+
+class TerritoryIndex:
+    """Bounding-box tree over a layer's polygons with exact containment tests."""
+
+    def __init__(self, features: list[dict[str, Any]], fetched_at: float):
+        self.fetched_at = fetched_at
+        self._providers = [f.get("p") for f in features]
+        self._rings = [f["rings"] for f in features]
+        self._boxes = [_rings_bbox(r) for r in self._rings]
+        self._root = _build(list(range(len(features))), self._boxes) if features else None
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+    def provider_at(self, x: float, y: float) -> Optional[str]:
+        if self._root is None:
+            return None
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            minx, miny, maxx, maxy = node.bbox
+            if not (minx <= x <= maxx and miny <= y <= maxy):
+                continue
+            for i in node.items:
+                bx = self._boxes[i]
+                if bx[0] <= x <= bx[2] and bx[1] <= y <= bx[3] and _point_in_rings(x, y, self._rings[i]):
+                    return self._providers[i]
+            stack.extend(node.children)
+        return None
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Snapshot files
+# ──────────────────────────────────────────────────────────────────────────────
+def snapshot_path(layer: LayerCfg) -> Path:
+    digest = hashlib.sha1(str(layer.url).encode()).hexdigest()[:16]
+    return TERRITORY_SNAPSHOT_DIR / f"{digest}.json"
+
+
+# url → (index, file mtime, last stat time)
+_loaded: dict[str, tuple[Optional[TerritoryIndex], float, float]] = {}
+
+
+def _load(layer: LayerCfg) -> Optional[TerritoryIndex]:
+    """Per-process index for `layer`, reloaded when the snapshot file changes."""
+    key = str(layer.url)
+    now = time.monotonic()
+    cached = _loaded.get(key)
+    if cached and now - cached[2] < TERRITORY_RECHECK_SECONDS:
+        return cached[0]
+
+    path = snapshot_path(layer)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        _loaded[key] = (None, 0.0, now)
+        return None
+
+    if cached and cached[1] == mtime:
+        _loaded[key] = (cached[0], mtime, now)
+        return cached[0]
+
+    try:
+        raw = json.loads(path.read_text())
+        index = TerritoryIndex(raw["features"], raw["fetched_at"])
+    except Exception as exc:
+        log.warning("unreadable territory snapshot %s: %s", path, exc)
+        index = None
+    _loaded[key] = (index, mtime, now)
+    return index
+
+
+def lookup(layer: LayerCfg, lon: float, lat: float) -> tuple[bool, Optional[str]]:
+    """
+    Returns (answered, provider). `answered` is False when the layer has no
+    usable snapshot (disabled, missing or older than snapshot_max_age) and
+    the caller should fall back to a live query.
+    """
+    if not layer.snapshot:
+        return False, None
+    index = _load(layer)
+    if index is None or time.time() - index.fetched_at > layer.snapshot_max_age:
+        return False, None
+    return True, index.provider_at(lon, lat)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Sync
+# ──────────────────────────────────────────────────────────────────────────────
+async def sync_layer(layer: LayerCfg) -> int:
+    """Download every polygon of `layer` into its snapshot; returns the feature count."""
+    from .parcel_lookup import _arcgis_fetch   # late import: parcel_lookup imports us
+
+    url = str(layer.url)
+    base = {"f": "json", "where": "1=1"}
+
+    meta = json.loads(await _arcgis_fetch(url.rsplit("/query", 1)[0], {"f": "json"}))
+    page = int(meta.get("maxRecordCount") or 1000)
+
+    ids = json.loads(await _arcgis_fetch(url, base | {"returnIdsOnly": True})).get("objectIds") or []
+    ids.sort()
+
+    features: list[dict[str, Any]] = []
+    for start in range(0, len(ids), page):
+        chunk = ids[start:start + page]
+        data = json.loads(await _arcgis_fetch(url, {
+            "f": "json",
+            "objectIds": ",".join(str(i) for i in chunk),
+            "outFields": layer.provider_field,
+            "returnGeometry": True,
+            "outSR": 4326,
+        }))
+        if "error" in data:
+            raise RuntimeError(f"ArcGIS error syncing {url}: {data['error']}")
+        for feat in data.get("features", []):
+            rings = (feat.get("geometry") or {}).get("rings")
+            if rings:
+                features.append({"p": feat["attributes"].get(layer.provider_field), "rings": rings})
+
+    path = snapshot_path(layer)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"url": url, "fetched_at": time.time(), "features": features}))
+    os.replace(tmp, path)   # atomic: readers never see a partial snapshot
+    return len(features)
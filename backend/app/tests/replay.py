@@ -0,0 +1,354 @@
+"""
+Offline ArcGIS for tests and benchmarks.
+
+ReplayTransport answers the ESRI clients' requests from recorded responses
+(JSONL, see RecordingTransport) and, for anything not recorded, from an
+optional fallback such as SyntheticArcgis, which fabricates deterministic
+parcels, territories and FLWMI rows for a catalogue county. Latency and
+upstream failures (5xx, 429, timeouts) can be injected; every decision is
+derived from the seed and the request itself, not from arrival order, so
+a run is reproducible however the lookups interleave.
+
+    transport = ReplayTransport(fallback=SyntheticArcgis(cfg), latency=0.02)
+    async with replay_clients(transport):
+        info = await get_utilities_for_parcel(...)
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import random
+import re
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+from urllib.parse import parse_qsl
+
+import httpx
+
+from ..config.models import CountyCfg
+from ..services import host_guard, http_client, response_cache, territory_index
+
+# (method, url without query, sorted params)
+RequestKey = tuple[str, str, tuple[tuple[str, str], ...]]
+Responder = Callable[[str, str, dict[str, str]], Optional[tuple[int, bytes]]]
+
+ERROR_KINDS = ("503", "429", "timeout", "connect")
+
+
+class ReplayMiss(LookupError):
+    """A request with no recording and no fallback."""
+
+
+async def _request_params(request: httpx.Request) -> dict[str, str]:
+    params = dict(request.url.params.multi_items())
+    if request.method == "POST":
+        body = (await request.aread()).decode()
+        params.update(parse_qsl(body, keep_blank_values=True))
+    return params
+
+
+def _base_url(request: httpx.Request) -> str:
+    return str(request.url.copy_with(query=None))
+
+
+def request_key(method: str, url: str, params: dict[str, Any]) -> RequestKey:
+    return method.upper(), url, tuple(sorted((k, str(v)) for k, v in params.items()))
+
+
+def load_recordings(path: str | Path) -> dict[RequestKey, tuple[int, bytes]]:
+    recordings: dict[RequestKey, tuple[int, bytes]] = {}
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                entry = json.loads(line)
+                key = request_key(entry["method"], entry["url"], dict(entry["params"]))
+                recordings[key] = (entry["status"], entry["body"].encode())
+    return recordings
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves recorded responses. `latency` (+ up to `jitter`) seconds is added
+    to every request; a fraction `error_rate` of requests fail instead with
+    one of `errors` (ERROR_KINDS). Retries of the same request draw again,
+    so a retried failure can succeed.
+
+    `rounds` is the longest chain of requests each started after the
+    previous one finished (sequential round trips, independent of how
+    long they took); `max_in_flight` the most requests open at once.
+    """
+
+    def __init__(
+        self,
+        recordings: dict[RequestKey, tuple[int, bytes]] | None = None,
+        fallback: Responder | None = None,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        errors: Iterable[str] = ("503",),
+        seed: int = 0,
+    ):
+        self.recordings = dict(recordings or {})
+        self.fallback = fallback
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.errors = tuple(errors)
+        unknown = set(self.errors) - set(ERROR_KINDS)
+        if unknown:
+            raise ValueError(f"unknown error kind(s): {', '.join(sorted(unknown))}")
+        self.seed = seed
+        self.stats: Counter = Counter()
+        self.rounds = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._seen: Counter = Counter()
+
+    @classmethod
+    def from_file(cls, path: str | Path, **kwargs: Any) -> "ReplayTransport":
+        return cls(load_recordings(path), **kwargs)
+
+    def _draw(self, key: RequestKey) -> random.Random:
+        n = self._seen[key]
+        self._seen[key] += 1
+        digest = hashlib.blake2b(repr((self.seed, key, n)).encode(), digest_size=8).digest()
+        return random.Random(int.from_bytes(digest, "big"))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        params = await _request_params(request)
+        url = _base_url(request)
+        key = request_key(request.method, url, params)
+        self.stats["requests"] += 1
+        self.stats[f"host:{request.url.host}"] += 1
+
+        depth = self.rounds + 1
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            return await self._respond(request, url, params, key)
+        finally:
+            self._in_flight -= 1
+            self.rounds = max(self.rounds, depth)
+
+    async def _respond(
+        self, request: httpx.Request, url: str, params: dict[str, str], key: RequestKey
+    ) -> httpx.Response:
+        # only draw when something is random, so plain replays keep no per-request state
+        rng = self._draw(key) if self.jitter or self.error_rate else None
+        delay = self.latency + (rng.random() * self.jitter if rng else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if rng and self.errors and rng.random() < self.error_rate:
+            kind = rng.choice(self.errors)
+            self.stats[f"error:{kind}"] += 1
+            if kind == "timeout":
+                raise httpx.ReadTimeout("injected read timeout", request=request)
+            if kind == "connect":
+                raise httpx.ConnectTimeout("injected connect timeout", request=request)
+            return httpx.Response(int(kind), content=b"{}", request=request)
+
+        hit = self.recordings.get(key)
+        if hit is not None:
+            self.stats["recorded"] += 1
+        elif self.fallback is not None:
+            hit = self.fallback(request.method, url, params)
+        if hit is None:
+            self.stats["misses"] += 1
+            raise ReplayMiss(f"no recording for {request.method} {url} {dict(key[2])}")
+
+        status, body = hit
+        return httpx.Response(
+            status, content=body, request=request, headers={"Content-Type": "application/json"}
+        )
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests to `inner` and appends each exchange to `path` (JSONL)."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, path: str | Path):
+        self.inner = inner
+        self.path = Path(path)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        params = await _request_params(request)
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        entry = {
+            "method": request.method,
+            "url": _base_url(request),
+            "params": sorted(params.items()),
+            "status": response.status_code,
+            "body": body.decode(),
+        }
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry) + "\n")
+        return httpx.Response(
+            response.status_code, headers=response.headers, content=body, request=request
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Synthetic upstream
+# ──────────────────────────────────────────────────────────────────────────────
+_EQ_RE = re.compile(r"(\w+)\s*=\s*'((?:[^']|'')*)'")
+_IN_RE = re.compile(r"(\w+)\s+IN\s*\(([^)]*)\)", re.I)
+_QUOTED_RE = re.compile(r"'((?:[^']|'')*)'")
+
+ELECTRIC_PROVIDERS = ["FPL", "LCEC"]
+WATER_PROVIDERS = ["Lee County Utilities", "FGUA", "City of Cape Coral", None]
+DW_VALUES = ["KnownWell", "Known Public", "LikelyWell", "Unknown"]
+WW_VALUES = ["KnownSeptic", "Known Sewer", "Public", "LikelySeptic", "Unknown"]
+
+
+def where_values(where: str) -> dict[str, list[str]]:
+    """Field → literal values from `F='x'` / `F IN ('x','y')` terms of a where clause."""
+    out: dict[str, list[str]] = {}
+    for field, values in _IN_RE.findall(where):
+        out.setdefault(field, []).extend(v.replace("''", "'") for v in _QUOTED_RE.findall(values))
+    for field, value in _EQ_RE.findall(_IN_RE.sub("", where)):
+        out.setdefault(field, []).append(value.replace("''", "'"))
+    return out
+
+
+class SyntheticArcgis:
+    """
+    Deterministic stand-in for one catalogue county's layers: every parcel,
+    provider and FLWMI value is a function of (seed, APN) or the centroid,
+    and a fraction `miss_rate` of APNs / `no_wells_rate` of FLWMI rows do
+    not exist. Use as a ReplayTransport fallback.
+    """
+
+    def __init__(
+        self,
+        cfg: CountyCfg,
+        *,
+        seed: int = 0,
+        miss_rate: float = 0.05,
+        no_wells_rate: float = 0.2,
+        bbox: tuple[float, float, float, float] = (-82.1, 26.3, -81.6, 26.8),
+    ):
+        self.cfg = cfg
+        self.seed = seed
+        self.miss_rate = miss_rate
+        self.no_wells_rate = no_wells_rate
+        self.bbox = bbox
+        self._kinds = {str(layer.url): (name, layer) for name, layer in cfg.layers().items()}
+
+    def _unit(self, *parts: Any) -> float:
+        digest = hashlib.blake2b(repr((self.seed, *parts)).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") / 2**64
+
+    def exists(self, apn: str) -> bool:
+        return self._unit("parcel", apn) >= self.miss_rate
+
+    def centroid(self, apn: str) -> tuple[float, float]:
+        x0, y0, x1, y1 = self.bbox
+        lon = x0 + (x1 - x0) * self._unit("lon", apn)
+        lat = y0 + (y1 - y0) * self._unit("lat", apn)
+        return round(lon, 6), round(lat, 6)
+
+    def provider(self, layer_name: str, lon: float, lat: float) -> Optional[str]:
+        choices = ELECTRIC_PROVIDERS if layer_name == "electric_territory_layer" else WATER_PROVIDERS
+        return choices[int(self._unit(layer_name, lon, lat) * len(choices))]
+
+    def wells_row(self, apn: str) -> Optional[dict[str, Any]]:
+        if not self.exists(apn) or self._unit("wells", apn) < self.no_wells_rate:
+            return None
+        return {
+            "PARCELNO": apn,
+            "ALT_KEY": None,
+            "DW": DW_VALUES[int(self._unit("dw", apn) * len(DW_VALUES))],
+            "WW": WW_VALUES[int(self._unit("ww", apn) * len(WW_VALUES))],
+            "OBJECTID": int(self._unit("oid", apn) * 10**7),
+        }
+
+    def _parcel_feature(self, apn: str) -> dict[str, Any]:
+        lon, lat = self.centroid(apn)
+        d = 0.0002
+        ring = [[lon, lat], [lon + d, lat], [lon + d, lat + d], [lon, lat + d], [lon, lat]]
+        return {"attributes": {self.cfg.id_field: apn}, "geometry": {"rings": [ring]}}
+
+    def __call__(self, method: str, url: str, params: dict[str, str]) -> Optional[tuple[int, bytes]]:
+        kind = self._kinds.get(url)
+        if kind is None:
+            return None
+        name, layer = kind
+        values = where_values(params.get("where", ""))
+
+        if name == "parcel_layer":
+            apns = values.get(self.cfg.id_field, [])
+            features = [self._parcel_feature(a) for a in dict.fromkeys(apns) if self.exists(a)]
+        elif name == "wells_layer":
+            apns = values.get("PARCELNO", []) + values.get("ALT_KEY", [])
+            rows = (self.wells_row(a) for a in dict.fromkeys(apns))
+            features = [{"attributes": r} for r in rows if r is not None]
+        else:
+            point = json.loads(params.get("geometry") or "null")
+            if not point:
+                return 200, b'{"features": []}'
+            provider = self.provider(name, point["x"], point["y"])
+            features = [] if provider is None else [{"attributes": {layer.provider_field: provider}}]
+        return 200, json.dumps({"features": features}).encode()
+
+
+class MemoryRedis:
+    """The slice of redis.asyncio the response cache uses, in a dict (expiry ignored)."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, ex=None, px=None, nx: bool = False) -> bool:
+        if nx and key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    async def delete(self, key: str) -> int:
+        return int(self.data.pop(key, None) is not None)
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.data)
+
+    async def aclose(self) -> None:
+        pass
+
+
+@contextlib.asynccontextmanager
+async def replay_clients(
+    transport: httpx.AsyncBaseTransport, redis: Optional[MemoryRedis] = None
+) -> AsyncIterator[httpx.AsyncBaseTransport]:
+    """
+    Route the ESRI clients through `transport` for the duration, with the
+    state that would make results depend on the machine switched off: the
+    Redis response cache (unless `redis` stands in for it), local territory
+    snapshots (an empty snapshot dir, so territory layers are queried) and
+    host-guard history.
+    """
+    saved = (response_cache.ARCGIS_CACHE_ENABLED, territory_index.TERRITORY_SNAPSHOT_DIR)
+    await http_client.close_http_clients()
+    host_guard._guards.clear()
+    territory_index._loaded.clear()
+    with tempfile.TemporaryDirectory() as snapshots:
+        response_cache.ARCGIS_CACHE_ENABLED = False
+        territory_index.TERRITORY_SNAPSHOT_DIR = Path(snapshots)
+        try:
+            await http_client.init_http_clients(prewarm=False, transport=transport)
+            response_cache._redis = redis
+            yield transport
+        finally:
+            await http_client.close_http_clients()
+            response_cache.ARCGIS_CACHE_ENABLED, territory_index.TERRITORY_SNAPSHOT_DIR = saved
+            host_guard._guards.clear()
+            territory_index._loaded.clear()
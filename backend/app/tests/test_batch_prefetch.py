@@ -0,0 +1,50 @@
+"""prefetch_batch: which rows a batched IN (...) response may answer."""
+import asyncio
+import json
+
+from ..config.loader import catalogue_store
+from ..services.parcel_lookup import prefetch_batch
+from .replay import ReplayTransport, SyntheticArcgis, replay_clients
+
+LEE = catalogue_store.resolve("Lee", "FL")
+APNS = ["12-44-25-00-00001.0000", "12-44-25-00-00002.0000", "12-44-25-00-00003.0000"]
+ROWS = [{"apn": a, "county": "Lee", "state": "FL"} for a in APNS]
+
+
+def _prefetch(fallback):
+    async def run():
+        async with replay_clients(ReplayTransport(fallback=fallback)):
+            return await prefetch_batch(ROWS)
+    return asyncio.run(run())
+
+
+def test_error_body_answers_nothing():
+    # ArcGIS reports a failed query as HTTP 200 with an "error" object
+    def upstream(method, url, params):
+        return 200, json.dumps({"error": {"code": 400, "message": "Unable to complete operation."}}).encode()
+
+    assert _prefetch(upstream) == [{}, {}, {}]
+
+
+def test_ids_match_regardless_of_case_and_padding():
+    synthetic = SyntheticArcgis(LEE, miss_rate=0, no_wells_rate=0)
+
+    def upstream(method, url, params):
+        status, body = synthetic(method, url, params)
+        data = json.loads(body)
+        for feat in data["features"]:
+            attrs = feat["attributes"]
+            for field in ("STRAP", "PARCELNO"):
+                if attrs.get(field):
+                    attrs[field] = f" {attrs[field].lower()} "
+        return status, json.dumps(data).encode()
+
+    for apn, pre in zip(APNS, _prefetch(upstream)):
+        lon, lat = synthetic.centroid(apn)
+        assert pre["parcel_layer"] == {"lon": lon, "lat": lat}
+        assert pre["wells_layer"][0]["DW"] == synthetic.wells_row(apn)["DW"]
+
+
+def test_absent_ids_in_complete_response_are_known_misses():
+    synthetic = SyntheticArcgis(LEE, miss_rate=1.0)      # no parcel exists
+    assert _prefetch(synthetic) == [{"parcel_layer": None, "wells_layer": []}] * 3
@@ -0,0 +1,25 @@
+"""alias_key: how callers may spell a county."""
+import pytest
+
+from ..config.loader import alias_key
+
+
+@pytest.mark.parametrize("place", [
+    "Hillsborough", "Hillsborough County", "hillsborough-county", "HILLSBOROUGH PARISH",
+    "Hillsborough Borough", " hillsborough  county ",
+])
+def test_suffix_words_are_dropped_but_names_are_not_cut(place):
+    assert alias_key(place, "FL") == "hillsborough|fl"
+
+
+@pytest.mark.parametrize("place, key", [
+    ("Lee", "lee|fl"),
+    ("Lee County", "lee|fl"),
+    ("lee_county", "lee|fl"),
+    ("St. Lucie County", "stlucie|fl"),
+    ("Orleans Parish", "orleans|fl"),
+    ("County", "county|fl"),          # a lone suffix is the name itself
+    ("12071", "12071|fl"),
+])
+def test_alias_key(place, key):
+    assert alias_key(place, " FL ") == key
@@ -0,0 +1,84 @@
+"""HostGuard: neither the half-open probe nor a queued caller may get stuck."""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from ..services.host_guard import HostGuard, UpstreamUnavailable
+
+
+def _half_open() -> HostGuard:
+    guard = HostGuard("example.test")
+    guard._open_until = time.monotonic() - 1      # cooldown over
+    assert guard.state == "half-open"
+    return guard
+
+
+def test_cancelled_probe_waiting_for_a_slot_releases_the_probe():
+    async def run():
+        guard = _half_open()
+        guard.limit, guard.inflight = 1.0, 1      # every slot taken
+
+        async def probe():
+            async with guard.slot():
+                pass
+
+        task = asyncio.create_task(probe())
+        await asyncio.sleep(0)                    # admitted as probe, queued in _acquire
+        assert guard._probing
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert not guard._probing
+        guard.inflight = 0
+        async with guard.slot():                  # the next call becomes the probe
+            pass
+        assert guard.state == "closed"
+
+    asyncio.run(run())
+
+
+def test_failed_probe_reopens_and_concurrent_calls_are_refused():
+    async def run():
+        guard = _half_open()
+        request = httpx.Request("GET", "https://example.test/query")
+        unavailable = httpx.HTTPStatusError(
+            "503", request=request, response=httpx.Response(503, request=request)
+        )
+        with pytest.raises(httpx.HTTPStatusError):
+            async with guard.slot():
+                with pytest.raises(UpstreamUnavailable):
+                    async with guard.slot():      # a second call while probing
+                        pass
+                raise unavailable
+        assert guard.state == "open"
+        assert not guard._probing
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_passes_its_wakeup_on():
+    async def run():
+        guard = HostGuard("example.test")
+        guard.limit, guard.inflight = 1.0, 1      # every slot taken
+
+        async def call():
+            async with guard.slot():
+                pass
+
+        first = asyncio.create_task(call())
+        second = asyncio.create_task(call())
+        await asyncio.sleep(0)                    # both queued in _acquire
+        guard._release()                          # wakes `first` only
+        guard._decrease()
+        first.cancel()                            # ... which dies before taking the slot
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        await asyncio.wait_for(second, timeout=1)
+        assert guard.inflight == 0
+        assert not guard._waiters
+
+    asyncio.run(run())
@@ -0,0 +1,85 @@
+"""
+Import-time checks for the API.
+
+Every gunicorn worker imports backend.app.main before it can serve, so
+heavy dependencies (pandas, openpyxl, pyarrow, celery) must load on first
+use or from the startup warm-up, never at module import. That is the hard
+gate. Each check runs in a fresh interpreter so modules already imported
+by pytest don't count.
+
+Wall-clock time is only compared against fastapi + sqlalchemy imported
+first in the same interpreter: the app's own import may take at most
+IMPORT_TIME_RATIO times that baseline, so a slow or busy machine slows
+both sides alike. IMPORT_TIME_BUDGET_MS adds an absolute ceiling for
+machines where one is known to hold.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+# -X importtime cumulative times, best of a few runs
+BASELINE_MODULES = ["fastapi", "sqlalchemy"]
+IMPORT_RATIO     = float(os.getenv("IMPORT_TIME_RATIO", "2.0"))   # about 1.1-1.4 today
+IMPORT_BUDGET_MS: Optional[float] = (
+    float(os.environ["IMPORT_TIME_BUDGET_MS"]) if os.getenv("IMPORT_TIME_BUDGET_MS") else None
+)
+RUNS = 3
+
+# only the file / job endpoints need these
+LAZY_MODULES = ["pandas", "numpy", "openpyxl", "pyarrow", "celery"]
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(REPO_ROOT),
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "import-time-test"),
+    }
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def _import_us() -> tuple[int, int]:
+    """(baseline, backend.app.main) cumulative import time in µs, from one interpreter."""
+    code = f"import {', '.join(BASELINE_MODULES)}; import backend.app.main"
+    proc = _python("-X", "importtime", "-c", code)
+    cumulative: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            cumulative[parts[2].strip()] = int(parts[1])
+    missing = [m for m in [*BASELINE_MODULES, "backend.app.main"] if m not in cumulative]
+    assert not missing, f"{missing} not found in -X importtime output"
+    return sum(cumulative[m] for m in BASELINE_MODULES), cumulative["backend.app.main"]
+
+
+def test_main_does_not_import_heavy_modules():
+    code = (
+        "import json, sys\n"
+        "import backend.app.main\n"
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))\n"
+    )
+    loaded = json.loads(_python("-c", code).stdout.strip().splitlines()[-1])
+    assert loaded == [], f"imported at startup: {loaded}"
+
+
+def test_main_import_time_within_budget():
+    samples = [_import_us() for _ in range(RUNS)]
+    ratio = min(main / base for base, main in samples)
+    assert ratio <= IMPORT_RATIO, (
+        f"importing backend.app.main took {ratio:.2f}x as long as {' + '.join(BASELINE_MODULES)}"
+        f" (budget {IMPORT_RATIO:.2f}x)"
+    )
+    if IMPORT_BUDGET_MS is not None:
+        best_ms = min((base + main) for base, main in samples) / 1000
+        assert best_ms <= IMPORT_BUDGET_MS, (
+            f"importing backend.app.main took {best_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+        )
@@ -0,0 +1,221 @@
+"""
+Offline benchmarks for the lookup path, on the replay transport.
+
+With no injected latency the timings are the app's own overhead per
+lookup (query building, single-flight, host guard, httpx, JSON,
+classification), so regressions show up without any county server. The
+request fan-out is checked from the transport's counters, not the clock:
+a single lookup must stay at two round trips (parcel + wells, then the
+territory layers).
+
+Wall-clock metrics are only reported by default, since they depend on the
+machine; set their budget through the env and/or compare against an
+earlier run on the same box to enforce them. Memory budgets always apply.
+
+    BENCH_REPORT=bench.json pytest app/tests/test_lookup_benchmarks.py
+    BENCH_BASELINE=bench.json BENCH_TOLERANCE=1.2 pytest app/tests/test_lookup_benchmarks.py
+"""
+import asyncio
+import gc
+import json
+import os
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from ..config.loader import catalogue_store
+from ..services.csv_processor import parse_in_memory
+from ..services.parcel_lookup import _arcgis_query, get_utilities_for_parcel
+from .replay import ReplayTransport, SyntheticArcgis, replay_clients
+
+# ---------- Tunables via env ----------
+def _budget(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+BENCH_LOOKUPS                     = int(os.getenv("BENCH_LOOKUPS", "200"))
+BENCH_BULK_ROWS                   = int(os.getenv("BENCH_BULK_ROWS", "1000"))
+BENCH_LATENCY_MS                  = float(os.getenv("BENCH_LATENCY_MS", "20"))
+# wall-clock budgets: unset = report only
+BENCH_LOOKUP_P95_MS               = _budget("BENCH_LOOKUP_P95_MS")
+BENCH_QUERY_P95_MS                = _budget("BENCH_QUERY_P95_MS")
+BENCH_BULK_MIN_ROWS_PER_S         = _budget("BENCH_BULK_MIN_ROWS_PER_S")
+BENCH_BULK_LATENCY_MIN_ROWS_PER_S = _budget("BENCH_BULK_LATENCY_MIN_ROWS_PER_S")
+BENCH_BULK_PEAK_KB_PER_ROW        = float(os.getenv("BENCH_BULK_PEAK_KB_PER_ROW", "64"))
+BENCH_LOOKUP_RETAINED_KB          = float(os.getenv("BENCH_LOOKUP_RETAINED_KB", "256"))
+BENCH_REPORT                      = os.getenv("BENCH_REPORT")
+BENCH_BASELINE                    = os.getenv("BENCH_BASELINE")
+BENCH_TOLERANCE                   = float(os.getenv("BENCH_TOLERANCE", "1.5"))   # allowed ratio vs baseline
+
+LEE = catalogue_store.resolve("Lee", "FL")
+SEED = 1
+
+
+def _apn(i: int) -> str:
+    return f"{i % 36:02d}-{44 + i % 3}-25-{i % 100:02d}-{i:05d}.0000"
+
+
+def _transport(**kwargs) -> ReplayTransport:
+    return ReplayTransport(fallback=SyntheticArcgis(LEE, seed=SEED), seed=SEED, **kwargs)
+
+
+def _csv(rows: int) -> bytes:
+    lines = ["APN,Street Address,County,State"]
+    lines += [f"{_apn(i)},{i} Main St,Lee,FL" for i in range(rows)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _pct(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@pytest.fixture(scope="module")
+def report():
+    metrics: dict[str, float] = {}
+    yield metrics
+    print("\nlookup benchmarks:\n" + "\n".join(f"  {k:<28}{v:12.3f}" for k, v in sorted(metrics.items())))
+    if BENCH_REPORT:
+        Path(BENCH_REPORT).write_text(json.dumps(metrics, indent=2, sort_keys=True))
+
+
+def _check(
+    report: dict, name: str, value: float, limit: Optional[float], higher_is_better: bool = False
+) -> None:
+    """Record `name`; fail on its budget (if any) or a regression vs BENCH_BASELINE."""
+    report[name] = value
+    if limit is not None:
+        ok = value >= limit if higher_is_better else value <= limit
+        assert ok, f"{name} = {value:.3f} (budget {limit:.3f})"
+    if BENCH_BASELINE:
+        base = json.loads(Path(BENCH_BASELINE).read_text()).get(name)
+        if base:
+            ratio = base / value if higher_is_better else value / base
+            assert ratio <= BENCH_TOLERANCE, (
+                f"{name} regressed: {value:.3f} vs baseline {base:.3f} (x{ratio:.2f}, tolerance x{BENCH_TOLERANCE})"
+            )
+
+
+async def _timed_lookups(n: int, offset: int = 0) -> list[float]:
+    samples = []
+    for i in range(offset, offset + n):
+        t0 = time.perf_counter()
+        await get_utilities_for_parcel(_apn(i), None, "Lee", "FL")
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def test_lookup_overhead(report):
+    async def run():
+        async with replay_clients(_transport()) as transport:
+            await _timed_lookups(20, offset=10**6)              # warm-up
+            return await _timed_lookups(BENCH_LOOKUPS), dict(transport.stats)
+
+    samples, stats = asyncio.run(run())
+    report["lookup_p50_ms"] = _pct(samples, 0.5) * 1000
+    report["lookup_requests"] = stats["requests"] / (BENCH_LOOKUPS + 20)
+    _check(report, "lookup_p95_ms", _pct(samples, 0.95) * 1000, BENCH_LOOKUP_P95_MS)
+
+
+def test_arcgis_query_overhead(report):
+    layer = LEE.parcel_layer
+
+    async def run():
+        samples = []
+        async with replay_clients(_transport()):
+            for i in range(BENCH_LOOKUPS):
+                t0 = time.perf_counter()
+                await _arcgis_query(layer, {"where": f"STRAP='{_apn(i)}'", "returnGeometry": True, "outSR": 4326})
+                samples.append(time.perf_counter() - t0)
+        return samples
+
+    samples = asyncio.run(run())
+    report["query_p50_ms"] = _pct(samples, 0.5) * 1000
+    _check(report, "query_p95_ms", _pct(samples, 0.95) * 1000, BENCH_QUERY_P95_MS)
+
+
+def test_lookup_round_trips():
+    # layers run concurrently: parcel + wells, then the three territories.
+    # The latency only keeps requests open long enough to overlap; what is
+    # asserted is the transport's request chain, not elapsed time.
+    latency = BENCH_LATENCY_MS / 1000
+
+    async def run(apn: str) -> ReplayTransport:
+        synthetic = SyntheticArcgis(LEE, seed=SEED, miss_rate=0)
+        async with replay_clients(ReplayTransport(fallback=synthetic, latency=latency)) as transport:
+            await get_utilities_for_parcel(apn, None, "Lee", "FL")
+        return transport
+
+    for i in range(5):
+        transport = asyncio.run(run(_apn(i)))
+        assert transport.stats["requests"] == 5
+        assert transport.rounds == 2, f"lookup took {transport.rounds} round trips (expected 2)"
+        assert transport.max_in_flight >= 3
+
+
+def test_bulk_throughput(report):
+    data = _csv(BENCH_BULK_ROWS)
+
+    async def run():
+        async with replay_clients(_transport()) as transport:
+            t0 = time.perf_counter()
+            results = await parse_in_memory(data, "bench.csv")
+            return time.perf_counter() - t0, results, dict(transport.stats)
+
+    elapsed, results, stats = asyncio.run(run())
+    assert len(results) == BENCH_BULK_ROWS
+    assert sum(r.info is not None for r in results) > 0.9 * BENCH_BULK_ROWS
+    report["bulk_requests_per_row"] = stats["requests"] / BENCH_BULK_ROWS
+    _check(report, "bulk_rows_per_s", BENCH_BULK_ROWS / elapsed, BENCH_BULK_MIN_ROWS_PER_S, higher_is_better=True)
+
+
+def test_bulk_throughput_with_latency(report):
+    # batched IN (...) queries + bounded concurrency: far fewer than 5 round trips per row
+    rows = min(BENCH_BULK_ROWS, 400)
+    data = _csv(rows)
+    latency = BENCH_LATENCY_MS / 1000
+
+    async def run():
+        async with replay_clients(_transport(latency=latency, jitter=latency / 2)):
+            t0 = time.perf_counter()
+            await parse_in_memory(data, "bench.csv")
+            return time.perf_counter() - t0
+
+    _check(report, "bulk_latency_rows_per_s", rows / asyncio.run(run()), BENCH_BULK_LATENCY_MIN_ROWS_PER_S,
+           higher_is_better=True)
+
+
+def test_allocations(report):
+    # tracemalloc slows everything down several times; keep these runs short
+    lookups_n = min(BENCH_LOOKUPS, 100)
+    data = _csv(min(BENCH_BULK_ROWS, 300))
+    rows = data.count(b"\n") - 1
+
+    async def lookups():
+        async with replay_clients(_transport()):
+            await _timed_lookups(20, offset=10**6)
+            gc.collect()
+            before = tracemalloc.get_traced_memory()[0]
+            await _timed_lookups(lookups_n)
+            gc.collect()
+            return tracemalloc.get_traced_memory()[0] - before
+
+    async def bulk():
+        async with replay_clients(_transport()):
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            await parse_in_memory(data, "bench.csv")
+            return tracemalloc.get_traced_memory()[1] - start
+
+    tracemalloc.start()
+    try:
+        retained = asyncio.run(lookups())
+        peak = asyncio.run(bulk())
+    finally:
+        tracemalloc.stop()
+    _check(report, "lookup_retained_kb", max(retained, 0) / 1024, BENCH_LOOKUP_RETAINED_KB)
+    _check(report, "bulk_peak_kb_per_row", peak / rows / 1024, BENCH_BULK_PEAK_KB_PER_ROW)
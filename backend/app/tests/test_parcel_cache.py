@@ -0,0 +1,160 @@
+"""
+The single-lookup cache in front of ArcGIS: which results count as "not
+found" and how long each kind is served. Cache rows live in an in-memory
+stand-in for the shared Parcel rows; test_postgis.py covers the SQL.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("SECRET_KEY", "parcel-cache-test")
+
+from ..config.loader import catalogue_store                        # noqa: E402
+from ..core.config import settings                                 # noqa: E402
+from ..services import parcel_cache                                # noqa: E402
+from .replay import MemoryRedis, ReplayTransport, SyntheticArcgis, replay_clients  # noqa: E402
+
+LEE = catalogue_store.resolve("Lee", "FL")
+APN = "12-44-25-00-00042.0000"
+
+
+class _CacheRows:
+    """crud_parcel's cache-row methods over a dict keyed like the table."""
+
+    def __init__(self):
+        self.rows: dict[tuple[str, str, str], SimpleNamespace] = {}
+        self.copies: list[dict] = []
+
+    async def get_cached(self, db, *, apn, county, state):
+        return self.rows.get((apn, county, state))
+
+    async def upsert_cached(self, db, *, apn, county, state, street_address, data, point=None):
+        self.rows[(apn, county, state)] = SimpleNamespace(data=data, centroid=point, updated_at=datetime.utcnow())
+
+    async def copy_cached_centroid(self, db, **kwargs):
+        self.copies.append(kwargs)
+
+    def age(self, seconds: float) -> None:
+        for row in self.rows.values():
+            row.updated_at -= timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def rows(monkeypatch):
+    cache = _CacheRows()
+    for name in ("get_cached", "upsert_cached", "copy_cached_centroid"):
+        monkeypatch.setattr(parcel_cache.crud_parcel, name, getattr(cache, name))
+    return cache
+
+
+def _lookups(transport, cache: _CacheRows, ages: list[float]) -> list[int]:
+    """
+    Look APN up; then, for each entry in `ages`, age the cache row that
+    much and look again. Returns the transport's request count after each.
+    """
+    async def run():
+        async with replay_clients(transport):
+            await parcel_cache.lookup_with_cache(None, apn=APN, address=None, county="Lee", state="FL")
+            seen = [transport.stats["requests"]]
+            for seconds in ages:
+                cache.age(seconds)
+                await parcel_cache.lookup_with_cache(None, apn=APN, address=None, county="Lee", state="FL")
+                seen.append(transport.stats["requests"])
+            return seen
+    return asyncio.run(run())
+
+
+def test_unknown_parcel_is_cached_as_not_found(rows):
+    transport = ReplayTransport(fallback=SyntheticArcgis(LEE, miss_rate=1.0))
+    negative = settings.PARCEL_CACHE_NEGATIVE_TTL_SECONDS
+    seen = _lookups(transport, rows, [negative - 60, 120])
+
+    (entry,) = rows.rows.values()
+    assert entry.data["found"] is False
+    assert seen[1] == seen[0]              # still inside the negative TTL
+    assert seen[2] > seen[1]               # past it: asked upstream again
+
+
+def test_known_parcel_uses_the_positive_ttl(rows):
+    transport = ReplayTransport(fallback=SyntheticArcgis(LEE, miss_rate=0))
+    negative = settings.PARCEL_CACHE_NEGATIVE_TTL_SECONDS
+    positive = settings.PARCEL_CACHE_TTL_SECONDS
+    seen = _lookups(transport, rows, [negative + 60, positive])
+
+    (entry,) = rows.rows.values()
+    assert entry.data["found"] is True
+    assert seen[1] == seen[0]              # a found parcel outlives the negative TTL
+    assert seen[2] > seen[1]               # ... but not the positive one
+
+
+def test_refresh_skips_the_response_cache(rows):
+    transport = ReplayTransport(fallback=SyntheticArcgis(LEE, miss_rate=0))
+    redis = MemoryRedis()
+
+    async def run():
+        async with replay_clients(transport, redis=redis):
+            await parcel_cache.lookup_with_cache(None, apn=APN, address=None, county="Lee", state="FL")
+            first = transport.stats["requests"]
+            rows.rows.clear()                      # not in Postgres; every body still in Redis
+            await parcel_cache.lookup_with_cache(None, apn=APN, address=None, county="Lee", state="FL")
+            cached = transport.stats["requests"]
+            await parcel_cache.lookup_with_cache(
+                None, apn=APN, address=None, county="Lee", state="FL", refresh=True
+            )
+            return first, cached, transport.stats["requests"]
+
+    first, cached, refreshed = asyncio.run(run())
+    assert redis.data
+    assert cached == first                         # served from Redis
+    assert refreshed == 2 * first                  # refresh went upstream for every layer
+
+
+@pytest.mark.parametrize("miss_rate, copies_on_hit", [(0, [True]), (1.0, [])])
+def test_cache_hits_only_fill_a_missing_owner_centroid(rows, miss_rate, copies_on_hit):
+    transport = ReplayTransport(fallback=SyntheticArcgis(LEE, miss_rate=miss_rate))
+
+    async def run():
+        async with replay_clients(transport):
+            for _ in range(2):
+                await parcel_cache.lookup_with_cache(
+                    None, apn=APN, address=None, county="Lee", state="FL", owner_id=7
+                )
+
+    asyncio.run(run())
+    fresh, *hits = rows.copies
+    assert fresh["owner_id"] == 7 and not fresh["only_missing"]
+    assert [c["only_missing"] for c in hits] == copies_on_hit   # no cached point: nothing to copy
+
+
+def test_spellings_of_a_county_share_one_row(rows):
+    transport = ReplayTransport(fallback=SyntheticArcgis(LEE, miss_rate=0))
+
+    async def run():
+        async with replay_clients(transport):
+            for county in ("Lee", "Lee County", "LEE COUNTY", "12071"):
+                await parcel_cache.lookup_with_cache(None, apn=APN, address=None, county=county, state="fl")
+            return transport.stats["requests"]
+
+    requests = asyncio.run(run())
+    assert list(rows.rows) == [(APN, "lee", "FL")]
+    assert requests == 5                       # one upstream lookup for all four spellings
+
+
+def test_unknown_county_keys_on_its_own_slug():
+    assert parcel_cache.cache_key(f" {APN} ", "Nowhere County", " tx ") == (APN, "nowhere-county", "TX")
+
+
+@pytest.mark.parametrize(
+    "raw, found",
+    [
+        (None, False),
+        ({"lon": None, "lat": None, "has_wells_row": False}, False),
+        ({"lon": -81.8, "lat": 26.6, "has_wells_row": False}, True),
+        ({"lon": None, "lat": None, "has_wells_row": True}, True),
+    ],
+)
+def test_found(raw, found):
+    assert parcel_cache._found(raw) is found
@@ -0,0 +1,113 @@
+"""
+The ESRI clients' network backend: DNS is cached, the connect timeout
+bounds resolution plus every address tried, and requests go through the
+httpcore pool that carries it.
+"""
+import asyncio
+import contextlib
+import time
+
+import httpcore
+import httpx
+import pytest
+
+from ..services import http_client
+from ..services.resolver import CachingResolverBackend
+
+
+class _Blackhole(httpcore.AsyncNetworkBackend):
+    """Every address hangs until its own timeout, like a filtered port."""
+
+    def __init__(self):
+        self.attempts: list[tuple[str, float]] = []
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.attempts.append((host, timeout))
+        await asyncio.sleep(timeout)
+        raise httpcore.ConnectTimeout(f"{host}:{port}")
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+
+def _resolver(addrs, dns_delay=0.0, inner=None):
+    resolver = CachingResolverBackend(ttl=60, inner=inner or _Blackhole())
+
+    async def lookup(host, port):
+        await asyncio.sleep(dns_delay)
+        return addrs
+
+    resolver._lookup = lookup
+    return resolver
+
+
+def _connect(resolver, timeout):
+    async def run():
+        t0 = time.monotonic()
+        with pytest.raises(httpcore.ConnectTimeout):
+            await resolver.connect_tcp("gis.example.com", 443, timeout=timeout)
+        return time.monotonic() - t0
+    return asyncio.run(run())
+
+
+def test_timeout_spans_all_addresses():
+    resolver = _resolver(["192.0.2.1", "192.0.2.2", "192.0.2.3"])
+    elapsed = _connect(resolver, 0.2)
+    assert elapsed < 0.35
+    attempts = resolver._inner.attempts
+    assert attempts[0][1] <= 0.2
+    assert sum(t for _, t in attempts) <= 0.2 + 0.01       # later addresses only get what is left
+    assert ("gis.example.com", 443) in resolver._cache     # a timeout is not a dead address
+
+
+def test_timeout_includes_resolution():
+    resolver = _resolver(["192.0.2.1"], dns_delay=0.15)
+    elapsed = _connect(resolver, 0.2)
+    assert elapsed < 0.35
+    assert resolver._inner.attempts[0][1] <= 0.06
+
+    slow_dns = _resolver(["192.0.2.1"], dns_delay=1.0)
+    assert _connect(slow_dns, 0.1) < 0.3
+    assert slow_dns._inner.attempts == []
+
+
+def test_client_requests_go_through_the_resolver(monkeypatch):
+    resolved = []
+    resolver = CachingResolverBackend(ttl=60)
+    lookup = resolver._lookup
+
+    async def counting_lookup(host, port):
+        resolved.append(host)
+        return await lookup(host, port)
+
+    resolver._lookup = counting_lookup
+    monkeypatch.setattr(http_client, "_resolver", resolver)
+
+    body = b'{"ok": true}'
+
+    async def handle(reader, writer):
+        # keep-alive: answer every request on the connection until the client closes it
+        with contextlib.suppress(asyncio.IncompleteReadError, ConnectionError):
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            async with http_client.build_esri_client() as client:
+                first = await client.get(f"http://localhost:{port}/arcgis/rest/services")
+                second = await client.get(f"http://localhost:{port}/arcgis/rest/services")
+            async with http_client.build_esri_client() as client:
+                with pytest.raises(httpx.ConnectError):
+                    await client.get("http://127.0.0.1:1/")
+        finally:
+            server.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.json() == second.json() == {"ok": True}
+    assert resolved == ["localhost"]                       # cached for the second request
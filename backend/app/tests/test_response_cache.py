@@ -0,0 +1,43 @@
+"""Shared Redis response cache: reads, and the refresh path that skips them."""
+import asyncio
+import json
+
+import pytest
+
+from ..services import response_cache
+from .replay import MemoryRedis
+
+URL = "https://gis.example.test/arcgis/rest/services/Parcels/MapServer/0/query"
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = MemoryRedis()
+    monkeypatch.setattr(response_cache, "_redis", fake)
+    return fake
+
+
+def _fetcher(version: list[int]):
+    async def fetch() -> bytes:
+        return json.dumps({"features": [], "version": version[0]}).encode()
+    return fetch
+
+
+def test_skip_cache_reads_fetches_and_stores(redis):
+    version = [1]
+    fetch = _fetcher(version)
+
+    async def query():
+        return (await response_cache.cached_fetch(URL, {"where": "1=1"}, fetch, ttl=60))["version"]
+
+    async def run():
+        seen = [await query()]
+        version[0] = 2
+        seen.append(await query())                 # served from Redis
+        with response_cache.skip_cache_reads():
+            seen.append(await query())             # upstream ...
+        seen.append(await query())                 # ... and written back
+        return seen
+
+    assert asyncio.run(run()) == [1, 1, 2, 2]
+    assert not response_cache.skipping_reads()
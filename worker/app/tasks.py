@@ -1,5 +1,77 @@
+import asyncio
+
 from worker.app.worker import celery_app
 
 @celery_app.task(name="worker.example.add")
 def add(x: int, y: int) -> int:    # type: ignore[return-value]
     return x + y
+
+
+async def _enrich(rows: list[dict], **bulk_opts) -> list[dict]:
+    from backend.app.services.http_client import init_http_clients, close_http_clients
+    from backend.app.services.bulk import enrich_all, to_utility_list
+
+    await init_http_clients()
+    try:
+        results = await enrich_all(rows, **bulk_opts)
+    finally:
+        await close_http_clients()
+    return to_utility_list(results).model_dump()
+
+
+@celery_app.task(name="worker.parcels.enrich_rows")
+def enrich_rows(rows: list[dict], concurrency: int | None = None,
+                per_host: int | None = None, batch_size: int | None = None) -> dict:  # type: ignore[return-value]
+    """Enrich parcel rows (apn / street_address / county / state) via the bulk engine."""
+    return asyncio.run(_enrich(
+        rows, concurrency=concurrency, per_host=per_host, batch_size=batch_size,
+    ))
+
+
+async def _run_bulk_job(job_id: str) -> None:
+    import uuid
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import NullPool
+    from backend.app.core.database import CONNECT_ARGS, DATABASE_URL
+    from backend.app.services.http_client import init_http_clients, close_http_clients
+    from backend.app.services.bulk_jobs import run_job
+
+    # fresh engine per task: asyncpg connections are bound to this task's event loop
+    engine = create_async_engine(DATABASE_URL, poolclass=NullPool, connect_args=CONNECT_ARGS)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    await init_http_clients()
+    try:
+        await run_job(session_factory, uuid.UUID(job_id))
+    finally:
+        await close_http_clients()
+        await engine.dispose()
+
+
+@celery_app.task(name="worker.parcels.run_bulk_job")
+def run_bulk_job(job_id: str) -> None:
+    """Process a job created by POST /parcels/jobs; results go to bulk_job_rows."""
+    asyncio.run(_run_bulk_job(job_id))
+
+
+async def _sync_territories() -> dict:
+    from backend.app.services.http_client import init_http_clients, close_http_clients
+    from backend.app.config.loader import catalogue_store
+    from backend.app.services.territory_index import sync_layer
+
+    counts: dict[str, int] = {}
+    await init_http_clients()
+    try:
+        for county, cfg in catalogue_store.entries.items():
+            for name, layer in cfg.layers().items():
+                if layer.snapshot:
+                    counts[f"{county}.{name}"] = await sync_layer(layer)
+    finally:
+        await close_http_clients()
+    return counts
+
+
+@celery_app.task(name="worker.territories.sync")
+def sync_territories() -> dict:  # type: ignore[return-value]
+    """Refresh the local territory polygon snapshots used for offline point-in-polygon."""
+    return asyncio.run(_sync_territories())
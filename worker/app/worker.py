@@ -18,6 +18,14 @@ celery_app = Celery(
 celery_app.conf.update(
     task_acks_late=True,
     task_reject_on_worker_lost=True,
+    beat_schedule={
+        # territory polygons change rarely; keep local snapshots fresh daily
+        "sync-territory-snapshots": {
+            "task": "worker.territories.sync",
+            "schedule": 24 * 3600,
+            "options": {"queue": "default"},
+        },
+    },
 )
 
 # ---------------------------------------------------------------------